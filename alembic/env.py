@@ -27,6 +27,8 @@ from app.models.user import User
 from app.models.todo import Todo
 from app.models.todo_share import TodoShare
 from app.models.audit_log import AuditLog
+from app.models.todo_archive import TodoArchive
+from app.models.revoked_token import RevokedToken
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -34,6 +36,13 @@ from app.models.audit_log import AuditLog
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# indexes that migrations create only when the database supports them
+OPTIONAL_INDEXES = {"ix_todos_title_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "index" and name in OPTIONAL_INDEXES)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -56,6 +65,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -79,7 +89,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,58 @@
+"""task deleted_at and archive
+
+Revision ID: 3ac3939b485d
+Revises: 68ad47fdc7d6
+Create Date: 2026-10-18 16:44:11.146484
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3ac3939b485d'
+down_revision: Union[str, Sequence[str], None] = '68ad47fdc7d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todos_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('shares', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_todos_archive_user_id'), 'todos_archive', ['user_id'], unique=False)
+    op.add_column('todos', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # deletion time of existing soft-deleted rows is unknown; their
+    # retention period starts now
+    op.execute("UPDATE todos SET deleted_at = now() WHERE is_deleted")
+    op.create_index('ix_todos_deleted_at', 'todos', ['deleted_at'], unique=False, postgresql_where=sa.text('is_deleted'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # put archived tasks back as soft-deleted rows before dropping the archive
+    op.execute("""
+        INSERT INTO todos (id, title, priority, completed, user_id, is_deleted)
+        SELECT id, title, priority, completed, user_id, true FROM todos_archive
+    """)
+    op.execute("""
+        INSERT INTO todo_shares (todo_id, user_id, permission)
+        SELECT a.id, (s ->> 'user_id')::int, s ->> 'permission'
+        FROM todos_archive a, jsonb_array_elements(a.shares) AS s
+        WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = (s ->> 'user_id')::int)
+    """)
+    op.drop_index('ix_todos_deleted_at', table_name='todos', postgresql_where=sa.text('is_deleted'))
+    op.drop_column('todos', 'deleted_at')
+    op.drop_index(op.f('ix_todos_archive_user_id'), table_name='todos_archive')
+    op.drop_table('todos_archive')
@@ -0,0 +1,36 @@
+"""indexes for access patterns
+
+Revision ID: 68ad47fdc7d6
+Revises: 69bf52c08a94
+Create Date: 2026-10-18 16:40:44.322077
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '68ad47fdc7d6'
+down_revision: Union[str, Sequence[str], None] = '69bf52c08a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so live tables keep taking writes; it cannot run
+    # inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todo_shares_user_id_todo_id', 'todo_shares', ['user_id', 'todo_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_user_id_live', 'todos', ['user_id', 'id'], unique=False, postgresql_where=sa.text('NOT is_deleted'), postgresql_concurrently=True)
+        op.create_index('ix_users_email_lower', 'users', [sa.literal_column('lower(email)')], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_live', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todo_shares_user_id_todo_id', table_name='todo_shares', postgresql_concurrently=True)
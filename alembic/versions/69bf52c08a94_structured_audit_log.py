@@ -0,0 +1,85 @@
+"""structured audit log
+
+Revision ID: 69bf52c08a94
+Revises: f0abe7fc0a85
+Create Date: 2026-10-18 16:39:01.750929
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '69bf52c08a94'
+down_revision: Union[str, Sequence[str], None] = 'f0abe7fc0a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('audit_logs', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('audit_logs', sa.Column('actor_id', sa.Integer(), nullable=True))
+    op.add_column('audit_logs', sa.Column('target_type', sa.String(length=32), nullable=True))
+    op.add_column('audit_logs', sa.Column('target_id', sa.Integer(), nullable=True))
+    op.add_column('audit_logs', sa.Column('detail', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.alter_column('audit_logs', 'id',
+               existing_type=sa.INTEGER(),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               autoincrement=True)
+
+    # the only event written so far was "Deleted task <id>" by admin_email
+    op.execute("""
+        UPDATE audit_logs a SET
+            actor_id = (SELECT u.id FROM users u WHERE u.email = a.admin_email),
+            target_type = 'task',
+            target_id = substring(a.action from 'Deleted task ([0-9]+)')::int,
+            detail = jsonb_build_object('admin_email', a.admin_email),
+            action = 'task.delete'
+        WHERE a.action LIKE 'Deleted task %'
+    """)
+
+    op.alter_column('audit_logs', 'action',
+               existing_type=sa.VARCHAR(),
+               type_=sa.String(length=32),
+               nullable=False)
+    op.create_index('ix_audit_logs_actor', 'audit_logs', ['actor_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_target', 'audit_logs', ['target_type', 'target_id', 'created_at', 'id'], unique=False)
+    op.create_foreign_key('audit_logs_actor_id_fkey', 'audit_logs', 'users', ['actor_id'], ['id'], ondelete='SET NULL')
+    op.drop_column('audit_logs', 'admin_email')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('audit_logs', sa.Column('admin_email', sa.VARCHAR(), autoincrement=False, nullable=True))
+    op.execute("""
+        UPDATE audit_logs a SET
+            admin_email = coalesce(
+                a.detail ->> 'admin_email',
+                (SELECT u.email FROM users u WHERE u.id = a.actor_id)
+            ),
+            action = 'Deleted task ' || a.target_id
+        WHERE a.action = 'task.delete'
+    """)
+    op.drop_constraint('audit_logs_actor_id_fkey', 'audit_logs', type_='foreignkey')
+    op.drop_index('ix_audit_logs_target', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_actor', table_name='audit_logs')
+    op.alter_column('audit_logs', 'action',
+               existing_type=sa.String(length=32),
+               type_=sa.VARCHAR(),
+               nullable=True)
+    op.alter_column('audit_logs', 'id',
+               existing_type=sa.BigInteger(),
+               type_=sa.INTEGER(),
+               existing_nullable=False,
+               autoincrement=True)
+    op.drop_column('audit_logs', 'detail')
+    op.drop_column('audit_logs', 'target_id')
+    op.drop_column('audit_logs', 'target_type')
+    op.drop_column('audit_logs', 'actor_id')
+    op.drop_column('audit_logs', 'created_at')
@@ -0,0 +1,37 @@
+"""user listing indexes
+
+Revision ID: 959f0222a91c
+Revises: b6b10e3d2863
+Create Date: 2026-10-18 17:15:49.439386
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '959f0222a91c'
+down_revision: Union[str, Sequence[str], None] = 'b6b10e3d2863'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so users keeps taking writes; the pattern index
+    # also serves the equality lookups the old one did, so it is built
+    # before that one is dropped
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email_lower_pattern', 'users', [sa.literal_column('lower(email) text_pattern_ops')], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_users_role_id', 'users', ['role', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email_lower', 'users', [sa.literal_column('lower(email)')], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_users_role_id', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower_pattern', table_name='users', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""task title search
+
+Revision ID: b6b10e3d2863
+Revises: 3ac3939b485d
+Create Date: 2026-10-18 16:45:39.782996
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6b10e3d2863'
+down_revision: Union[str, Sequence[str], None] = '3ac3939b485d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # stored generated column: Postgres rewrites todos once here and
+    # keeps the vector in step with title on every write after that
+    op.add_column('todos', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english'::regconfig, coalesce(title, ''))", persisted=True), nullable=True))
+
+    bind = op.get_bind()
+    trgm = bind.scalar(sa.text(
+        "SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    ))
+    if trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_search_vector', 'todos', ['search_vector'], unique=False, postgresql_using='gin', postgresql_where=sa.text('NOT is_deleted'), postgresql_concurrently=True)
+        if trgm:
+            # lets title ILIKE '%...%' use an index (see app.core.search)
+            op.create_index('ix_todos_title_trgm', 'todos', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_where=sa.text('NOT is_deleted'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_title_trgm', table_name='todos', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_todos_search_vector', table_name='todos', postgresql_concurrently=True)
+    op.drop_column('todos', 'search_vector')
@@ -0,0 +1,28 @@
+"""add user change version
+
+Revision ID: f0abe7fc0a85
+Revises: 1c652ac72adb
+Create Date: 2026-10-18 10:12:31.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0abe7fc0a85'
+down_revision: Union[str, Sequence[str], None] = '1c652ac72adb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'change_version')
@@ -1,5 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
+from app.core.hashing import hash_pool
+from app.core.profiles import get_user_profile_by_email
 from app.models.user import User
 
 pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -24,11 +27,18 @@ def verify_password(password: str, hashed: str):
     return pwd.verify(password, hashed)
 
 
-def register_user(db: Session, name: str, email: str, password: str):
-    if db.query(User).filter(User.email == email).first():
+async def register_user(db: AsyncSession, name: str, email: str, password: str):
+    hash_pool.ensure_capacity()
+
+    if await get_user_profile_by_email(db, email):
         return None
 
-    hashed_password = hash_password(password)
+    # end the read so no pooled connection is held while hashing
+    await db.commit()
+
+    # bcrypt is CPU bound, keep it off the event loop;
+    # raises HashPoolBusy when the hashing queue is full
+    hashed_password = await hash_pool.run(hash_password, password)
 
     user = User(
         name=name,
@@ -36,17 +46,28 @@ def register_user(db: Session, name: str, email: str, password: str):
         password=hashed_password
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    hash_pool.ensure_capacity()
+
+    # read straight from the table: password hashes stay out of the
+    # profile cache and its shared backend
+    user = (
+        await db.execute(
+            select(User.id, User.role, User.password).where(User.email == email)
+        )
+    ).first()
     if not user:
         return None
 
-    if not verify_password(password, user.password):
+    # end the read so no pooled connection is held while hashing
+    await db.commit()
+
+    if not await hash_pool.run(verify_password, password, user.password):
         return None
 
     return user
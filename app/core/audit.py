@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models.audit_log import AuditAction, AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+AUDIT_RETRY_DELAY = float(os.getenv("AUDIT_RETRY_DELAY", 5))
+
+
+class AuditWriter:
+    """
+    Buffers audit events in memory and inserts them in batches
+    from a background task, off the request's transaction.
+
+    Events are stamped when they are recorded, so created_at is
+    the time of the action, not of the flush. A batch that fails
+    to insert is retried; events recorded while the buffer is full
+    are dropped and counted. Anything still buffered when the
+    process dies is lost, which is the price of not writing
+    inline.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+        retry_delay: float
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.retry_delay = retry_delay
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # batch taken off the queue but not yet written
+        self._pending: list = []
+        # the background task's current insert of _pending
+        self._writing: asyncio.Task | None = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+        self.batches = 0
+
+    def record(
+        self,
+        actor_id: int | None,
+        action: AuditAction,
+        target_type: str | None = None,
+        target_id: int | None = None,
+        detail: dict | None = None
+    ):
+        """
+        Queue one event. Never blocks and never raises.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            self._queue.put_nowait({
+                "created_at": datetime.now(timezone.utc),
+                "actor_id": actor_id,
+                "action": action,
+                "target_type": target_type,
+                "target_id": target_id,
+                "detail": detail,
+            })
+            self.recorded += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def flush(self):
+        """
+        Write everything buffered so far.
+        """
+        if self._pending:
+            await self._write(self._pending)
+            self._pending = []
+
+        while self._queue is not None and not self._queue.empty():
+            await self._write(self._take(self.batch_size))
+
+    async def stop(self):
+        """
+        Stop the background task, then write what is left.
+
+        An insert already under way is let finish first, so a batch
+        it commits is not written a second time.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        if self._writing is not None:
+            # a failed insert leaves _pending for flush() to retry
+            with suppress(Exception):
+                await self._writing
+            self._writing = None
+
+        try:
+            await self.flush()
+        except Exception as exc:
+            lost = len(self._pending) + self._queue.qsize()
+            logger.warning("audit: %d events lost at shutdown: %s", lost, exc)
+
+    def stats(self):
+        return {
+            "buffered": len(self._pending) + (self._queue.qsize() if self._queue else 0),
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+    def _take(self, limit: int):
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch):
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditLog), batch)
+            await db.commit()
+
+        self.written += len(batch)
+        self.batches += 1
+
+    async def _write_pending(self):
+        await self._write(self._pending)
+        self._pending = []
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # wait for the first event, then give the batch time to fill
+            event = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+            while self._queue.qsize() < self.batch_size - 1:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.05))
+
+            self._pending = [event, *self._take(self.batch_size - 1)]
+            while True:
+                try:
+                    # shielded: cancelling the writer (stop()) must not
+                    # abandon an insert that may already have committed
+                    self._writing = asyncio.ensure_future(self._write_pending())
+                    await asyncio.shield(self._writing)
+                    break
+                except Exception as exc:
+                    self.failures += 1
+                    logger.warning("audit: writing %d events failed: %s",
+                                   len(self._pending), exc)
+                    await asyncio.sleep(self.retry_delay)
+
+
+audit = AuditWriter(
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL,
+    queue_size=AUDIT_QUEUE_SIZE,
+    retry_delay=AUDIT_RETRY_DELAY,
+)
@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+# name -> cache, so stats can be reported from one place
+caches = {}
+
+
+class TTLCache:
+    """
+    Thread-safe, size bounded LRU cache with per-entry expiry.
+
+    Every invalidation bumps `generation`. A caller that loads a
+    value from the database should read `generation` first and pass
+    it to set(), so a value loaded before an invalidating write is
+    dropped instead of being cached.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, enabled: bool = True):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled and maxsize > 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+        caches[name] = self
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float | None = None, generation: int | None = None):
+        if not self.enabled:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Drop `key` and return the value it held, if any, without
+        counting a hit or miss.
+        """
+        with self._lock:
+            self.generation += 1
+            entry = self._data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def delete_where(self, predicate):
+        """
+        Drop every entry whose key matches `predicate`.
+        """
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,16 @@
+"""
+Environment configuration, loaded once.
+
+Importing this module reads .env into os.environ (variables already
+set win) so every module that reads its settings with os.getenv at
+import time sees them. main.py imports it first; modules that can
+also be entry points (the engine, security) import it themselves.
+"""
+import time
+
+from dotenv import load_dotenv
+
+# earliest point of the app's own imports, for the startup report
+IMPORT_STARTED = time.perf_counter()
+
+load_dotenv()
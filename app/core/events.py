@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import os
+from contextlib import suppress
+
+import asyncpg
+import orjson
+from sqlalchemy import literal, select, text, union_all
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.engine import DATABASE_URL
+from app.models.todo import Todo
+from app.models.todo_share import TodoShare
+
+logger = logging.getLogger(__name__)
+
+TASK_EVENTS_CHANNEL = os.getenv("TASK_EVENTS_CHANNEL", "task_events")
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", 256))
+STREAM_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT", 15))
+STREAM_MAX_AGE = float(os.getenv("STREAM_MAX_AGE", 300))
+STREAM_RECONNECT_DELAY = float(os.getenv("STREAM_RECONNECT_DELAY", 1))
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+NOTIFY_MANY = text(
+    "SELECT pg_notify(:channel, payload) "
+    "FROM unnest(CAST(:payloads AS text[])) AS payload"
+)
+
+
+async def notify_task_changes(
+    db: AsyncSession,
+    event: str,
+    task_ids,
+    revoked: dict | None = None
+):
+    """
+    Queue one NOTIFY per task for its owner and sharees.
+
+    Runs inside the caller's transaction: Postgres delivers the
+    notifications on commit, so rolled back writes never reach
+    clients. `revoked` maps a task id to users who just lost
+    access; like everyone on a "deleted" event, they are told
+    to drop the task.
+    """
+    task_ids = list(task_ids)
+    revoked = revoked or {}
+
+    audience = union_all(
+        select(
+            Todo.id.label("task_id"),
+            Todo.user_id,
+            literal("owner").label("permission")
+        ).where(Todo.id.in_(task_ids)),
+        select(
+            TodoShare.todo_id,
+            TodoShare.user_id,
+            TodoShare.permission
+        ).where(TodoShare.todo_id.in_(task_ids))
+    ).subquery("audience")
+
+    rows = (
+        await db.execute(
+            select(
+                Todo.id,
+                Todo.title,
+                Todo.priority,
+                Todo.completed,
+                audience.c.user_id,
+                audience.c.permission
+            ).join(audience, audience.c.task_id == Todo.id)
+        )
+    ).all()
+
+    messages = {}
+    for task_id, title, priority, completed, user_id, permission in rows:
+        message = messages.setdefault(task_id, {
+            "type": event,
+            "id": task_id,
+            "task": None if event == "deleted" else {
+                "id": task_id,
+                "title": title,
+                "priority": priority,
+                "completed": completed
+            },
+            "audience": []
+        })
+        if event == "deleted":
+            permission = None
+        message["audience"].append((user_id, permission))
+
+    for task_id, user_ids in revoked.items():
+        if task_id in messages:
+            messages[task_id]["audience"].extend(
+                (user_id, None) for user_id in user_ids
+            )
+
+    payloads = []
+    for message in messages.values():
+        payload = orjson.dumps(message)
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT:
+            # too big to carry the task; recipients reload instead
+            payload = orjson.dumps({
+                "type": "resync",
+                "id": message["id"],
+                "audience": message["audience"]
+            })
+        payloads.append(payload.decode())
+
+    if payloads:
+        await db.execute(
+            NOTIFY_MANY,
+            {"channel": TASK_EVENTS_CHANNEL, "payloads": payloads}
+        )
+
+
+def sse(data: dict) -> bytes:
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+RESYNC = sse({"type": "resync"})
+
+# notifications after which cached access to the task may be wrong;
+# "resync" ones no longer say what changed
+ACCESS_EVENTS = frozenset({"deleted", "shared", "unshared", "resync"})
+
+
+class TaskEventHub:
+    """
+    Per-process fan-out of task change notifications.
+
+    One dedicated connection, outside the pool so it never holds a
+    request slot, LISTENs on the channel; every worker process runs
+    its own hub, so a write in any worker reaches all of them. Each
+    notification is turned into per-user deltas and put on the
+    queues of that user's open streams.
+
+    A subscriber whose queue overflows, or who may have missed
+    notifications while the listener reconnected, gets a "resync"
+    event and reloads its list.
+
+    Access listeners are called with the task id of every event that
+    may change who can access a task, and with None after a
+    reconnect, when any task may have changed; this is how every
+    worker drops its cached permissions.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        queue_size: int,
+        heartbeat: float,
+        max_age: float,
+        reconnect_delay: float
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_age = max_age
+        self.reconnect_delay = reconnect_delay
+
+        self.subscribers: dict[int, set[asyncio.Queue]] = {}
+        self.listening = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.notifications = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.reconnects = 0
+
+        self.access_listeners = []
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """
+        Stop listening and end every open stream.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        for queues in self.subscribers.values():
+            for queue in queues:
+                self._put(queue, None)
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        self.start()
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self.subscribers.get(user_id)
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[user_id]
+
+    async def stream(self, user_id: int):
+        """
+        Server-Sent Events body for one client.
+
+        Sends "ready" once notifications are flowing, then deltas,
+        with comment heartbeats in between. The stream ends after
+        max_age seconds so long-lived connections do not hold up a
+        graceful shutdown; clients simply reconnect.
+        """
+        queue = self.subscribe(user_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_age
+        # one pending get() shared by both loops, so a frame that lands
+        # while waiting for the listener is not lost
+        getter = asyncio.ensure_future(queue.get())
+
+        try:
+            # the listener may be down for a while (DB outage); max_age
+            # and stop() still apply
+            while not self.listening.is_set():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+
+                listening = asyncio.ensure_future(self.listening.wait())
+                done, _ = await asyncio.wait(
+                    {getter, listening},
+                    timeout=min(self.heartbeat, remaining),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                listening.cancel()
+
+                if getter in done:
+                    if getter.result() is None:
+                        return
+                    break
+                if not self.listening.is_set():
+                    yield b": waiting\n\n"
+
+            yield sse({"type": "ready"})
+
+            while (remaining := deadline - loop.time()) > 0:
+                done, _ = await asyncio.wait(
+                    {getter}, timeout=min(self.heartbeat, remaining)
+                )
+                if not done:
+                    yield b": keep-alive\n\n"
+                    continue
+
+                frame = getter.result()
+                if frame is None:
+                    return
+                yield frame
+                getter = asyncio.ensure_future(queue.get())
+        finally:
+            getter.cancel()
+            self.unsubscribe(user_id, queue)
+
+    def stats(self):
+        return {
+            "listening": self.listening.is_set(),
+            "streams": sum(len(queues) for queues in self.subscribers.values()),
+            "users": len(self.subscribers),
+            "notifications": self.notifications,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "reconnects": self.reconnects,
+        }
+
+    def _put(self, queue: asyncio.Queue, frame):
+        try:
+            queue.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # the client is behind; drop what is queued and ask for a reload
+        self.overflows += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC if frame is not None else None)
+
+    def _broadcast(self, frame):
+        for queues in self.subscribers.values():
+            for queue in queues:
+                self._put(queue, frame)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.notifications += 1
+        message = orjson.loads(payload)
+
+        if message["type"] in ACCESS_EVENTS:
+            for listener in self.access_listeners:
+                listener(message["id"])
+
+        frames = {}
+        for user_id, permission in message["audience"]:
+            queues = self.subscribers.get(user_id)
+            if not queues:
+                continue
+
+            frame = frames.get(permission)
+            if frame is None:
+                if message["type"] == "resync":
+                    frame = RESYNC
+                elif permission is None:
+                    frame = sse({"type": message["type"], "id": message["id"]})
+                else:
+                    frame = sse({
+                        "type": message["type"],
+                        "id": message["id"],
+                        "task": {**message["task"], "permission": permission}
+                    })
+                frames[permission] = frame
+
+            for queue in queues:
+                self._put(queue, frame)
+                self.delivered += 1
+
+    async def _listen(self):
+        connected_before = False
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("task events: connect failed: %s", exc)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                self.listening.set()
+
+                if connected_before:
+                    self.reconnects += 1
+                    self._broadcast(RESYNC)
+                    for listener in self.access_listeners:
+                        listener(None)
+                connected_before = True
+
+                # asyncpg only notices a dead socket when it is used
+                while not closed.is_set():
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(closed.wait(), self.heartbeat)
+                    if not closed.is_set():
+                        await connection.execute("SELECT 1")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("task events: listener lost: %s", exc)
+            finally:
+                self.listening.clear()
+                with suppress(Exception):
+                    await asyncio.shield(connection.close(timeout=1))
+
+            await asyncio.sleep(self.reconnect_delay)
+
+
+def listen_dsn(url: str) -> str:
+    """
+    libpq-style DSN for asyncpg from a SQLAlchemy database URL.
+    """
+    return make_url(url).set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+task_events = TaskEventHub(
+    listen_dsn(DATABASE_URL),
+    TASK_EVENTS_CHANNEL,
+    queue_size=STREAM_QUEUE_SIZE,
+    heartbeat=STREAM_HEARTBEAT,
+    max_age=STREAM_MAX_AGE,
+    reconnect_delay=STREAM_RECONNECT_DELAY,
+)
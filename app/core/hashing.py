@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# bcrypt releases the GIL while hashing, so plain threads give real parallelism.
+# The pool is per process: by default all workers together (WEB_CONCURRENCY,
+# as read by uvicorn) hash on at most half the cores, leaving the rest for
+# request handling.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+HASH_WORKERS = int(os.getenv(
+    "HASH_WORKERS",
+    max(1, (os.cpu_count() or 2) // 2 // max(1, WEB_CONCURRENCY))
+))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", 32))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", 1))
+# Nice value for hashing threads so request handling wins the CPU (Linux)
+HASH_NICE = int(os.getenv("HASH_NICE", 10))
+
+
+class HashPoolBusy(Exception):
+    """
+    Raised when the hashing queue is full.
+    """
+
+
+def lower_thread_priority(nice: int):
+    """
+    Executor initializer: renice the current worker thread.
+    """
+    if not nice or not hasattr(os, "setpriority"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except OSError:
+        pass
+
+
+class HashPool:
+    """
+    Dedicated thread pool for password hashing with a bounded queue.
+
+    At most `workers + queue_size` jobs are accepted at once; past that
+    submit() fails fast with HashPoolBusy instead of queueing.
+    """
+
+    def __init__(self, workers: int, queue_size: int, nice: int = 0):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.nice = nice
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # created on first use, and again after shutdown()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt",
+                initializer=lower_thread_priority,
+                initargs=(self.nice,)
+            )
+        return self._executor
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+
+    def ensure_capacity(self):
+        """
+        Fail fast before doing other work for a job that would be rejected.
+        """
+        if self.pending >= self.capacity:
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise HashPoolBusy()
+            self.pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # release the slot when the work finishes, even if the caller goes away
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """
+        Cancel queued jobs and let the threads exit once their current
+        hash is done. A later run() starts a fresh executor.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = HashPool(HASH_WORKERS, HASH_QUEUE_SIZE, HASH_NICE)
@@ -0,0 +1,134 @@
+"""
+Database reachability for readiness probes.
+
+A background pinger runs SELECT 1 every HEALTH_PING_INTERVAL seconds
+on its own connection, outside the pool, and keeps the outcome and
+recent latencies. Probes read that state, so however often they come
+they cost no database round trip and never wait for a pool slot.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import suppress
+
+import asyncpg
+
+from app.core.events import listen_dsn
+from app.database.engine import DATABASE_URL, DB_MAX_OVERFLOW, async_pool_stats
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PING_INTERVAL = float(os.getenv("HEALTH_PING_INTERVAL", 2))
+HEALTH_PING_TIMEOUT = float(os.getenv("HEALTH_PING_TIMEOUT", 1))
+HEALTH_PING_HISTORY = int(os.getenv("HEALTH_PING_HISTORY", 10))
+# not ready once the last successful ping is older than this
+HEALTH_STALE_AFTER = float(
+    os.getenv("HEALTH_STALE_AFTER", HEALTH_PING_INTERVAL * 3)
+)
+
+
+class DatabasePinger:
+    """
+    Pings the database in the background and remembers how it went.
+    """
+
+    def __init__(self, dsn: str, interval: float, timeout: float, history: int, stale_after: float):
+        self.dsn = dsn
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+        # seconds per ping, None for a failed one; newest last
+        self.latencies: deque[float | None] = deque(maxlen=history)
+        self.last_ok: float | None = None
+        self.last_error: str | None = None
+        self.failures = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    @property
+    def up(self) -> bool:
+        return (
+            self.last_ok is not None
+            and time.monotonic() - self.last_ok <= self.stale_after
+        )
+
+    def state(self):
+        pool = async_pool_stats.snapshot()
+        capacity = (pool["pool_size"] or 0) + DB_MAX_OVERFLOW
+        return {
+            "database": "up" if self.up else "down",
+            "last_ok_seconds_ago": (
+                round(time.monotonic() - self.last_ok, 3)
+                if self.last_ok is not None else None
+            ),
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+            "ping_ms": [
+                round(latency * 1000, 3) if latency is not None else None
+                for latency in self.latencies
+            ],
+            "pool": {
+                "in_use": pool["in_use"],
+                "capacity": capacity,
+                "utilisation": round(pool["in_use"] / capacity, 3) if capacity else None,
+                "checked_in": pool["checked_in"],
+                "overflow": pool["overflow"],
+                "timeouts": pool["timeouts"],
+                "wait_avg_ms": round(pool["wait_avg_ms"], 3),
+            },
+        }
+
+    def _failed(self, error: str):
+        self.latencies.append(None)
+        self.failures += 1
+        if self.last_error != error:
+            logger.warning("health: database ping failed: %s", error)
+        self.last_error = error
+
+    async def _run(self):
+        connection = None
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    if connection is None or connection.is_closed():
+                        connection = await asyncpg.connect(self.dsn, timeout=self.timeout)
+                    await connection.fetchval("SELECT 1", timeout=self.timeout)
+                except (OSError, asyncio.TimeoutError, asyncpg.PostgresError,
+                        asyncpg.InterfaceError) as exc:
+                    self._failed(f"{type(exc).__name__}: {exc}")
+                    if connection is not None:
+                        connection.terminate()
+                        connection = None
+                else:
+                    self.latencies.append(time.perf_counter() - started)
+                    self.last_ok = time.monotonic()
+                    self.failures = 0
+                    self.last_error = None
+
+                await asyncio.sleep(self.interval)
+        finally:
+            if connection is not None:
+                connection.terminate()
+
+
+db_pinger = DatabasePinger(
+    listen_dsn(DATABASE_URL),
+    interval=HEALTH_PING_INTERVAL,
+    timeout=HEALTH_PING_TIMEOUT,
+    history=HEALTH_PING_HISTORY,
+    stale_after=HEALTH_STALE_AFTER,
+)
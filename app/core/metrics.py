@@ -0,0 +1,277 @@
+"""
+Per-request instrumentation.
+
+SQLAlchemy cursor hooks and the pool's checkout timer report into
+the RequestStats of the request being served, found through a
+context variable. MetricsMiddleware turns each finished request
+into Prometheus histograms per route: statements, database time,
+pool wait and handler time. GET /metrics serves them.
+
+Metrics live in process memory, so with several uvicorn workers
+each scrape sees only the worker that answered it.
+"""
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in (
+    "1", "true", "yes"
+)
+
+# statements slower than this are logged with their route; 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50, 100)
+
+
+class RequestStats:
+    """
+    What one request (or one count_queries() block) spent on the
+    database. Nested blocks also report to the enclosing one.
+    """
+
+    __slots__ = ("statements", "db_time", "pool_wait", "scope", "parent", "closed")
+
+    def __init__(self, parent: "RequestStats | None" = None):
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        # the ASGI scope, for requests
+        self.scope = None
+        self.parent = parent
+        # background tasks started during a request inherit its
+        # context; once the request is over their queries are theirs
+        self.closed = False
+
+    def chain(self):
+        stats = self
+        while stats is not None:
+            if not stats.closed:
+                yield stats
+            stats = stats.parent
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """
+    Prometheus histogram with one series per label tuple.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # a count per bucket plus +Inf, then the sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values):
+                total += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the response is sent.",
+    (*ROUTE_LABELS, "status"), SECONDS_BUCKETS,
+)
+request_statements = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request.",
+    ROUTE_LABELS, COUNT_BUCKETS,
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time per request spent executing SQL statements.",
+    ROUTE_LABELS, SECONDS_BUCKETS,
+)
+request_pool_wait = Histogram(
+    "http_request_pool_wait_seconds",
+    "Time per request spent waiting for a pooled connection.",
+    ROUTE_LABELS, SECONDS_BUCKETS,
+)
+statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of single SQL statements, by the route that ran them.",
+    ROUTE_LABELS, SECONDS_BUCKETS,
+)
+
+HISTOGRAMS = (
+    request_duration,
+    request_statements,
+    request_db_time,
+    request_pool_wait,
+    statement_duration,
+)
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def route_labels(scope) -> tuple:
+    # the route template, not the raw path, keeps the series bounded
+    route = scope.get("route")
+    return (scope.get("method", ""), getattr(route, "path", "unmatched"))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_start
+
+    scope = None
+    stats = _current.get()
+    if stats is not None:
+        for s in stats.chain():
+            s.statements += 1
+            s.db_time += elapsed
+            scope = scope or s.scope
+
+    if scope is not None:
+        statement_duration.observe(route_labels(scope), elapsed)
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        where = " ".join(route_labels(scope)) if scope is not None else "-"
+        logger.warning(
+            "slow query (%.1f ms) in %s: %s",
+            elapsed * 1000, where, " ".join(statement.split())[:1000]
+        )
+
+
+def instrument_engine(sync_engine):
+    """
+    Count and time every statement an engine executes.
+    """
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def observe_pool_wait(seconds: float):
+    stats = _current.get()
+    if stats is not None:
+        for s in stats.chain():
+            s.pool_wait += seconds
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the statements run inside the block, including those of
+    in-process requests it makes (e.g. through httpx's ASGI
+    transport).
+    """
+    stats = RequestStats(_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        stats.closed = True
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block"):
+    """
+    Fail with AssertionError if the block runs more than `limit`
+    statements; catches N+1 regressions.
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.statements > limit:
+        raise AssertionError(
+            f"{label} ran {stats.statements} statements, expected at most {limit}"
+        )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording each HTTP request's metrics once the
+    response is finished.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # startup warm-up requests (app.core.startup) are not traffic
+        if scope["type"] != "http" or scope.get("warmup"):
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(_current.get())
+        # the router fills in scope["route"] before the handler runs
+        stats.scope = scope
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            stats.closed = True
+
+            labels = route_labels(scope)
+            request_duration.observe((*labels, str(status)), elapsed)
+            request_statements.observe(labels, stats.statements)
+            request_db_time.observe(labels, stats.db_time)
+            request_pool_wait.observe(labels, stats.pool_wait)
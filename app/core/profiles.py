@@ -0,0 +1,288 @@
+"""
+Cached user profiles: id, name, email and role. The password hash is
+never cached, here or in the shared backend; login reads it from the
+table.
+
+Lookups by id or email go through a process-local TTLCache, then an
+optional shared backend (set_shared_backend), then the database.
+Committed ORM writes to User invalidate the entries they touch;
+bulk UPDATEs of profile columns clear the whole cache. Plain SQL
+writes are not seen, so USER_CACHE_TTL bounds how long another
+worker's, or such a write's, stale entry can live.
+"""
+import asyncio
+import logging
+import os
+from typing import NamedTuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() in (
+    "1", "true", "yes"
+)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+
+# keys: ("id", user_id) -> UserProfile, ("email", email) -> user_id
+profile_cache = TTLCache(
+    "user_profiles",
+    maxsize=int(os.getenv("USER_CACHE_SIZE", 10000)),
+    ttl=USER_CACHE_TTL,
+    enabled=USER_CACHE_ENABLED,
+)
+
+PROFILE_FIELDS = ("id", "name", "email", "role")
+
+
+class UserProfile(NamedTuple):
+    id: int
+    name: str
+    email: str
+    role: str
+
+
+class InMemoryBackend:
+    """
+    Shared backend stand-in holding entries in a dict. A real one
+    (Redis, memcached) implements the same three coroutines and
+    stores whatever JSON-able values it is given.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def get_many(self, keys: list[str]) -> dict:
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    async def set_many(self, items: dict, ttl: float):
+        self.data.update(items)
+
+    async def delete_many(self, keys: list[str]):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+shared_backend = None
+# delete tasks scheduled from commit hooks, kept so they are not collected
+_pending_deletes: set = set()
+
+
+def set_shared_backend(backend):
+    """
+    Use `backend` (or None) as the cache behind the local one.
+    """
+    global shared_backend
+    shared_backend = backend
+
+
+def _shared_key(key: tuple) -> str:
+    return f"user:{key[0]}:{key[1]}"
+
+
+async def _shared_get(keys: list[tuple]) -> dict:
+    if shared_backend is None or not keys:
+        return {}
+    try:
+        found = await shared_backend.get_many([_shared_key(k) for k in keys])
+    except Exception as exc:
+        logger.warning("user cache: shared get failed: %s", exc)
+        return {}
+    return {k: found[_shared_key(k)] for k in keys if _shared_key(k) in found}
+
+
+async def _shared_set(items: dict):
+    if shared_backend is None or not items:
+        return
+    try:
+        await shared_backend.set_many(
+            {_shared_key(k): v for k, v in items.items()}, USER_CACHE_TTL
+        )
+    except Exception as exc:
+        logger.warning("user cache: shared set failed: %s", exc)
+
+
+async def _shared_delete(keys: list[tuple]):
+    try:
+        await shared_backend.delete_many([_shared_key(k) for k in keys])
+    except Exception as exc:
+        logger.warning("user cache: shared delete failed: %s", exc)
+
+
+def _remember(profile: UserProfile, generation: int) -> dict:
+    profile_cache.set(("id", profile.id), profile, generation=generation)
+    profile_cache.set(("email", profile.email), profile.id, generation=generation)
+    return {("id", profile.id): list(profile), ("email", profile.email): profile.id}
+
+
+async def get_user_profiles(db: AsyncSession, user_ids) -> dict[int, UserProfile]:
+    """
+    Profiles for the given ids that exist, by id.
+    """
+    profiles = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        profile = profile_cache.get(("id", user_id))
+        if profile is None:
+            missing.append(user_id)
+        else:
+            profiles[user_id] = profile
+
+    if not missing:
+        return profiles
+
+    generation = profile_cache.generation
+
+    found = await _shared_get([("id", user_id) for user_id in missing])
+    for (_, user_id), values in found.items():
+        profile = UserProfile(*values)
+        _remember(profile, generation)
+        profiles[user_id] = profile
+    missing = [user_id for user_id in missing if user_id not in profiles]
+
+    if missing:
+        rows = await db.execute(
+            select(*(getattr(User, f) for f in PROFILE_FIELDS))
+            .where(User.id.in_(missing))
+        )
+        loaded = {}
+        for row in rows.all():
+            profile = UserProfile(*row)
+            loaded.update(_remember(profile, generation))
+            profiles[profile.id] = profile
+        await _shared_set(loaded)
+
+    return profiles
+
+
+async def get_user_profile(db: AsyncSession, user_id: int) -> UserProfile | None:
+    return (await get_user_profiles(db, [user_id])).get(user_id)
+
+
+async def get_user_profiles_by_email(db: AsyncSession, emails) -> dict[str, UserProfile]:
+    """
+    Profiles for the given emails that exist, by email. Emails
+    match exactly, as in the queries they replace.
+    """
+    emails = list(dict.fromkeys(emails))
+    ids = {}
+    unknown = []
+    for email in emails:
+        user_id = profile_cache.get(("email", email))
+        if user_id is None:
+            unknown.append(email)
+        else:
+            ids[email] = user_id
+
+    generation = profile_cache.generation
+
+    found = await _shared_get([("email", email) for email in unknown])
+    for (_, email), user_id in found.items():
+        ids[email] = user_id
+
+    profiles = {}
+    by_id = await get_user_profiles(db, ids.values())
+    for email, user_id in ids.items():
+        profile = by_id.get(user_id)
+        # an entry left over from before an email change is ignored
+        if profile is not None and profile.email == email:
+            profiles[email] = profile
+
+    missing = [email for email in emails if email not in profiles]
+    if missing:
+        rows = await db.execute(
+            select(*(getattr(User, f) for f in PROFILE_FIELDS))
+            .where(User.email.in_(missing))
+        )
+        loaded = {}
+        for row in rows.all():
+            profile = UserProfile(*row)
+            loaded.update(_remember(profile, generation))
+            profiles[profile.email] = profile
+        await _shared_set(loaded)
+
+    return profiles
+
+
+async def get_user_profile_by_email(db: AsyncSession, email: str) -> UserProfile | None:
+    return (await get_user_profiles_by_email(db, [email])).get(email)
+
+
+def invalidate_user_profiles(user_ids=(), emails=()):
+    """
+    Drop cached profiles locally and, in the background, from the
+    shared backend.
+    """
+    keys = [("id", user_id) for user_id in user_ids]
+    keys += [("email", email) for email in emails]
+    for key in list(keys):
+        profile = profile_cache.delete(key)
+        # the email entry of a user invalidated by id
+        if isinstance(profile, UserProfile):
+            profile_cache.delete(("email", profile.email))
+            keys.append(("email", profile.email))
+
+    if shared_backend is not None and keys:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(_shared_delete(keys))
+        _pending_deletes.add(task)
+        task.add_done_callback(_pending_deletes.discard)
+
+
+PROFILE_COLUMNS = {"name", "email", "role"}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_writes(session, flush_context):
+    written = session.info.setdefault("user_profiles_written", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            written.add(("id", obj.id))
+            written.add(("email", obj.email))
+            # the old address of an email change
+            written.update(
+                ("email", email) for email in inspect(obj).attrs.email.history.deleted
+            )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_user_writes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not User:
+        return
+
+    # change_version bumps do not touch the profile
+    values = getattr(orm_execute_state.statement, "_values", None) or {}
+    columns = {getattr(column, "key", column) for column in values}
+    if orm_execute_state.is_delete or columns & PROFILE_COLUMNS:
+        orm_execute_state.session.info["user_profiles_clear"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_user_writes(session):
+    # the shared backend cannot be cleared wholesale; its entries
+    # expire within USER_CACHE_TTL
+    if session.info.pop("user_profiles_clear", False):
+        profile_cache.clear()
+    written = session.info.pop("user_profiles_written", None)
+    if written:
+        invalidate_user_profiles(
+            [v for kind, v in written if kind == "id" and v is not None],
+            [v for kind, v in written if kind == "email" and v is not None],
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_user_writes(session):
+    session.info.pop("user_profiles_clear", None)
+    session.info.pop("user_profiles_written", None)
@@ -0,0 +1,157 @@
+"""
+Move soft-deleted tasks past their retention period, with their
+shares, out of todos/todo_shares into todos_archive.
+
+Runs as a CLI:
+
+    python -m app.core.purge --days 30 --batch-size 500 --pause 0.5
+
+or inside the app when PURGE_INTERVAL (seconds) is set.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+
+from sqlalchemy import cast, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import AsyncSessionLocal
+from app.models.todo import Todo
+from app.models.todo_archive import TodoArchive
+from app.models.todo_share import TodoShare
+
+logger = logging.getLogger(__name__)
+
+PURGE_RETENTION_DAYS = float(os.getenv("PURGE_RETENTION_DAYS", 30))
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 500))
+PURGE_BATCH_PAUSE = float(os.getenv("PURGE_BATCH_PAUSE", 0.5))
+PURGE_INTERVAL = float(os.getenv("PURGE_INTERVAL", 0))
+
+
+async def archive_batch(db, cutoff, batch_size: int) -> int:
+    """
+    Archive up to `batch_size` of the oldest purgeable tasks in one
+    transaction and return how many were moved.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so purges running
+    in several workers at once split the work instead of colliding.
+    """
+    task_ids = (
+        await db.scalars(
+            select(Todo.id)
+            .where(Todo.is_deleted == True, Todo.deleted_at < cutoff)
+            .order_by(Todo.deleted_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+
+    if not task_ids:
+        await db.rollback()
+        return 0
+
+    shares = (
+        select(
+            func.coalesce(
+                func.jsonb_agg(
+                    func.jsonb_build_object(
+                        "user_id", TodoShare.user_id,
+                        "permission", TodoShare.permission
+                    )
+                ),
+                cast(literal("[]"), JSONB)
+            )
+        )
+        .where(TodoShare.todo_id == Todo.id)
+        .scalar_subquery()
+    )
+
+    await db.execute(
+        insert(TodoArchive).from_select(
+            ["id", "title", "priority", "completed", "user_id", "deleted_at", "shares"],
+            select(
+                Todo.id,
+                Todo.title,
+                Todo.priority,
+                Todo.completed,
+                Todo.user_id,
+                Todo.deleted_at,
+                shares
+            ).where(Todo.id.in_(task_ids))
+        )
+    )
+    await db.execute(delete(TodoShare).where(TodoShare.todo_id.in_(task_ids)))
+    await db.execute(delete(Todo).where(Todo.id.in_(task_ids)))
+    await db.commit()
+
+    return len(task_ids)
+
+
+async def purge_deleted_tasks(
+    retention_days: float = PURGE_RETENTION_DAYS,
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause: float = PURGE_BATCH_PAUSE,
+    max_batches: int | None = None
+):
+    """
+    Archive every task soft-deleted more than `retention_days` ago,
+    `batch_size` rows per transaction with `pause` seconds between
+    batches, so the purge never holds locks or the pool for long.
+    """
+    started = time.perf_counter()
+    archived = 0
+    batches = 0
+
+    async with AsyncSessionLocal() as db:
+        cutoff = await db.scalar(
+            select(func.now() - timedelta(days=retention_days))
+        )
+        await db.rollback()
+
+        while max_batches is None or batches < max_batches:
+            moved = await archive_batch(db, cutoff, batch_size)
+            if not moved:
+                break
+
+            archived += moved
+            batches += 1
+            if moved < batch_size:
+                break
+            await asyncio.sleep(pause)
+
+    return {
+        "archived": archived,
+        "batches": batches,
+        "cutoff": cutoff.isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def run_purge_loop(interval: float = PURGE_INTERVAL):
+    """
+    Background task: purge every `interval` seconds until cancelled.
+    """
+    while True:
+        try:
+            result = await purge_deleted_tasks()
+            if result["archived"]:
+                logger.info("purge: %s", result)
+        except Exception as exc:
+            logger.warning("purge failed: %s", exc)
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive soft-deleted tasks past retention.")
+    parser.add_argument("--days", type=float, default=PURGE_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=PURGE_BATCH_PAUSE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    print(asyncio.run(purge_deleted_tasks(
+        args.days, args.batch_size, args.pause, args.max_batches
+    )))
@@ -0,0 +1,12 @@
+from sqlalchemy.engine import Result
+
+
+def rows_as_dicts(result: Result) -> list[dict]:
+    """
+    Turn a column-tuple result into plain dicts keyed by column label.
+
+    Skips ORM entity hydration and per-row RowMapping objects, so
+    list endpoints can hand the rows straight to ORJSONResponse.
+    """
+    keys = tuple(result.keys())
+    return [dict(zip(keys, row)) for row in result.all()]
@@ -0,0 +1,227 @@
+"""
+Refresh token revocation.
+
+Revoked ids are written to revoked_tokens and announced with NOTIFY
+in the same transaction. An id is a session's sid, revoked at logout,
+which ends every token rotated from that login (or the jti of a token
+issued before sids existed). Rotation itself writes nothing, so the
+list only grows with logouts. Every worker keeps the unexpired ids in
+a dict (id -> exp) fed by a LISTEN connection, and reloads the table
+whenever that connection is (re)established, so /refresh checks a
+token with one dict lookup. While a worker is not in sync (starting
+up, or its listener reconnecting) checks fall back to the table.
+
+Expired entries are dropped from memory and from the table on the
+listener's heartbeat; a token past its exp fails decoding anyway.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import suppress
+from datetime import datetime, timezone
+
+import asyncpg
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import listen_dsn
+from app.database import AsyncSessionLocal
+from app.database.engine import DATABASE_URL
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = os.getenv("REVOCATION_CHANNEL", "token_revocations")
+REVOCATION_HEARTBEAT = float(os.getenv("REVOCATION_HEARTBEAT", 15))
+REVOCATION_RECONNECT_DELAY = float(os.getenv("REVOCATION_RECONNECT_DELAY", 1))
+# how often a worker deletes expired rows from revoked_tokens
+REVOCATION_COMPACT_INTERVAL = float(os.getenv("REVOCATION_COMPACT_INTERVAL", 3600))
+
+LOAD = """
+    SELECT jti, extract(epoch FROM expires_at)::float8
+    FROM revoked_tokens WHERE expires_at > now()
+"""
+COMPACT = "DELETE FROM revoked_tokens WHERE expires_at <= now()"
+
+
+class RevocationList:
+    """
+    Per-process set of revoked refresh token sids and jtis, kept in sync
+    with revoked_tokens through LISTEN/NOTIFY.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        heartbeat: float,
+        reconnect_delay: float,
+        compact_interval: float
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.compact_interval = compact_interval
+
+        self.revoked: dict[str, float] = {}
+        self.synced = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._compacted_at = 0.0
+
+        self.notifications = 0
+        self.reloads = 0
+        self.fallbacks = 0
+        self.compacted = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            # an Event binds to the loop that first waits on it
+            self.synced = asyncio.Event()
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def is_revoked(self, jti: str | None) -> bool:
+        """
+        Whether this jti or sid was revoked. Tokens issued without
+        one cannot be revoked that way.
+
+        Opens a session only for the table fallback, so the in-sync
+        path costs no pool checkout or session setup.
+        """
+        if jti is None:
+            return False
+        if self.synced.is_set():
+            return jti in self.revoked
+
+        self.fallbacks += 1
+        async with AsyncSessionLocal() as db:
+            found = await db.scalar(
+                select(RevokedToken.jti).where(RevokedToken.jti == jti)
+            )
+        return found is not None
+
+    async def revoke(self, db: AsyncSession, jti: str, user_id: int, exp: float):
+        """
+        Record a sid (or jti) as revoked until `exp` and announce it,
+        unless it already was.
+
+        Runs inside the caller's transaction; call remember() once
+        it commits so this worker sees it without waiting for the
+        notification.
+        """
+        inserted = (
+            insert(RevokedToken)
+            .values(
+                jti=jti,
+                user_id=user_id,
+                expires_at=datetime.fromtimestamp(exp, timezone.utc)
+            )
+            .on_conflict_do_nothing()
+            .returning(RevokedToken.jti)
+            .cte("inserted")
+        )
+        # one round trip: the NOTIFY is sent only if a row went in
+        await db.execute(
+            select(
+                inserted.c.jti,
+                func.pg_notify(
+                    self.channel,
+                    orjson.dumps({"jti": jti, "exp": exp}).decode()
+                )
+            )
+        )
+
+    def remember(self, jti: str, exp: float):
+        if exp > time.time():
+            self.revoked[jti] = exp
+
+    def compact(self) -> int:
+        now = time.time()
+        expired = [jti for jti, exp in self.revoked.items() if exp <= now]
+        for jti in expired:
+            del self.revoked[jti]
+        return len(expired)
+
+    def stats(self):
+        return {
+            "synced": self.synced.is_set(),
+            "revoked": len(self.revoked),
+            "notifications": self.notifications,
+            "reloads": self.reloads,
+            "fallbacks": self.fallbacks,
+            "compacted": self.compacted,
+        }
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.notifications += 1
+        message = orjson.loads(payload)
+        self.remember(message["jti"], message["exp"])
+
+    async def _reload(self, connection):
+        # listening already, so nothing revoked from here on is missed;
+        # merged rather than replaced, as revocations are never undone
+        # and notifications may land while the rows load
+        rows = await connection.fetch(LOAD)
+        self.revoked.update(rows)
+        self.reloads += 1
+        self.synced.set()
+
+    async def _maintain(self, connection):
+        self.compacted += self.compact()
+
+        now = time.monotonic()
+        if now - self._compacted_at >= self.compact_interval:
+            self._compacted_at = now
+            status = await connection.execute(COMPACT)
+            deleted = int(status.split()[-1])
+            if deleted:
+                logger.info("revocations: deleted %s expired rows", deleted)
+
+    async def _listen(self):
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("revocations: connect failed: %s", exc)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                await self._reload(connection)
+
+                while not closed.is_set():
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(closed.wait(), self.heartbeat)
+                    if not closed.is_set():
+                        await self._maintain(connection)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("revocations: listener lost: %s", exc)
+            finally:
+                self.synced.clear()
+                with suppress(Exception):
+                    await asyncio.shield(connection.close(timeout=1))
+
+            await asyncio.sleep(self.reconnect_delay)
+
+
+revocations = RevocationList(
+    listen_dsn(DATABASE_URL),
+    REVOCATION_CHANNEL,
+    heartbeat=REVOCATION_HEARTBEAT,
+    reconnect_delay=REVOCATION_RECONNECT_DELAY,
+    compact_interval=REVOCATION_COMPACT_INTERVAL,
+)
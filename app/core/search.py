@@ -0,0 +1,50 @@
+from sqlalchemy import func, or_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.todo import Todo
+
+SEARCH_CONFIG = "english"
+
+# pg_trgm can only use its index for patterns of 3+ characters
+MIN_SUBSTRING_LENGTH = 3
+
+TRIGRAM_INDEX = "ix_todos_title_trgm"
+
+_trigram_index: bool | None = None
+
+
+async def substring_search_enabled(db: AsyncSession) -> bool:
+    """
+    Whether the trigram index exists, looked up once per process.
+
+    The migration only creates it where pg_trgm is available;
+    without it a substring match is a scan of every title, so
+    search sticks to words.
+    """
+    global _trigram_index
+    if _trigram_index is None:
+        _trigram_index = bool(await db.scalar(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+            {"name": TRIGRAM_INDEX}
+        ))
+    return _trigram_index
+
+
+def title_search(q: str, substring: bool = False):
+    """
+    Filter and rank expression for a title search.
+
+    Matches words through the search_vector GIN index (websearch
+    syntax: quoted phrases, OR, -exclusions) and, with `substring`
+    and a query of three or more characters, plain substrings
+    through title ILIKE, served by the trigram index.
+    Word matches rank by ts_rank_cd; substring-only matches rank 0.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    condition = Todo.search_vector.op("@@")(query)
+
+    if substring and len(q) >= MIN_SUBSTRING_LENGTH:
+        condition = or_(condition, Todo.title.icontains(q, autoescape=True))
+
+    rank = func.ts_rank_cd(Todo.search_vector, query)
+    return condition, rank
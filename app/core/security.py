@@ -1,9 +1,12 @@
+import hashlib
 import os
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-from dotenv import load_dotenv
 
-load_dotenv()
+from app.core import config  # noqa: F401  loads .env before any setting is read
+from app.core.cache import TTLCache
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -17,6 +20,19 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(
 )
 
 
+# Verified token payloads, keyed by token digest, kept until the token's exp
+TOKEN_CACHE_ENABLED = os.getenv(
+    "TOKEN_CACHE_ENABLED", "true"
+).lower() in ("1", "true", "yes")
+
+token_cache = TTLCache(
+    "tokens",
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", 10000)),
+    ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    enabled=TOKEN_CACHE_ENABLED,
+)
+
+
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY is not set in environment variables")
 
@@ -35,26 +51,55 @@ def create_access_token(user_id: int, role: str):
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_refresh_token(user_id: int, role: str):
+def create_refresh_token(user_id: int, role: str, sid: str | None = None):
     """
     Create a JWT refresh token with user id and role.
+
+    Its jti lets it be revoked on its own; sid names the login session
+    it belongs to, kept by every token rotated from it, so the whole
+    session can be revoked at once. A new session starts without sid.
     """
     payload = {
         "sub": str(user_id),
         "role": role,
         "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "sid": sid or uuid.uuid4().hex,
         "exp": datetime.now(timezone.utc)
         + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def session_expiry() -> float:
+    """
+    A time after which no token of a session revoked now can be valid:
+    each one was issued before now and lives REFRESH_TOKEN_EXPIRE_DAYS.
+    """
+    return time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
 def decode_token(token: str):
     """
     Decode and validate a JWT token.
     Returns payload if valid, otherwise None.
+
+    Valid payloads are cached until the token expires,
+    so repeat requests skip the signature check.
     """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(key, dict(payload), ttl=exp - time.time())
+
+    return payload
@@ -0,0 +1,189 @@
+"""
+Startup warm-up, run from the app's lifespan before it takes traffic.
+
+Pays up front what the first requests of a fresh worker would
+otherwise pay: mapper configuration, opening pool connections,
+loading the bcrypt backend and hashing threads, and building and
+compiling the SQL of the hot read endpoints. The last step sends
+those endpoints in-process requests as a user id that matches no
+rows, so they run their real statements and return nothing.
+
+Each step's duration is logged and kept in `startup_report`. A step
+that fails or runs past STARTUP_STEP_TIMEOUT is logged and recorded
+under "failed", and startup goes on: a database that is down at boot
+shows up in /health/ready instead of stopping the worker.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.controllers.auth_controller import pwd
+from app.core.config import IMPORT_STARTED
+from app.core.hashing import hash_pool
+from app.core.security import create_access_token, decode_token
+from app.database import async_engine
+from app.database.engine import DB_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() in (
+    "1", "true", "yes"
+)
+# connections opened at startup; more than the pool size would only
+# be closed again as overflow
+STARTUP_POOL_CONNECTIONS = min(
+    int(os.getenv("STARTUP_POOL_CONNECTIONS", DB_POOL_SIZE)), DB_POOL_SIZE
+)
+# seconds a warm-up step may take before it is given up
+STARTUP_STEP_TIMEOUT = float(os.getenv("STARTUP_STEP_TIMEOUT", 10))
+
+# endpoints whose statements are compiled at startup. None of them
+# changes data: task 0 never exists, so the PATCH's UPDATE matches no
+# row and the DELETE stops at its ownership check.
+WARMUP_REQUESTS = (
+    ("GET", "/me", "", b""),
+    ("GET", "/tasks", "", b""),
+    ("GET", "/tasks", "completed=false&priority=High", b""),
+    ("GET", "/tasks", "permission=editor", b""),
+    ("GET", "/tasks", "q=warmup", b""),
+    ("PATCH", "/tasks/0", "", b'{"completed": true}'),
+    ("DELETE", "/tasks/0", "", b""),
+    ("GET", "/admin/users", "", b""),
+    ("GET", "/admin/users", "include_counts=true", b""),
+    ("GET", "/admin/tasks", "", b""),
+    ("GET", "/admin/tasks", "q=warmup", b""),
+    ("GET", "/admin/audit", "", b""),
+)
+WARMUP_USER_ID = 0
+
+startup_report: dict = {}
+
+
+async def open_pool(connections: int):
+    """
+    Open `connections` pooled connections at once and hand them back,
+    so they are idle in the pool when the first requests arrive.
+    """
+    if connections <= 0:
+        return
+    opened = await asyncio.gather(
+        *(async_engine.connect() for _ in range(connections))
+    )
+    try:
+        # each one runs a statement, which also sets up the driver's
+        # per-connection type codecs
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in opened))
+    finally:
+        for conn in opened:
+            await conn.close()
+
+
+def load_crypto():
+    # the first bcrypt use loads and self-tests the backend
+    pwd.handler().get_backend()
+    # jose resolves its HMAC backend on first use
+    decode_token(create_access_token(WARMUP_USER_ID, "user"))
+
+
+async def asgi_request(
+    app, method: str, path: str, query: str, body: bytes, headers: dict
+) -> int:
+    """
+    Send one request through the ASGI app and return its status.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        # kept out of the /metrics request histograms
+        "warmup": True,
+    }
+    status = 500
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def warm_statements(app):
+    token = create_access_token(WARMUP_USER_ID, "admin")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    for method, path, query, body in WARMUP_REQUESTS:
+        status = await asgi_request(app, method, path, query, body, headers)
+        if status >= 500:
+            logger.warning("startup: warm-up %s %s answered %s", method, path, status)
+
+
+async def timed(report: dict, failed: dict, step: str, awaitable):
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(awaitable, STARTUP_STEP_TIMEOUT)
+    except Exception as exc:
+        failed[step] = f"{type(exc).__name__}: {exc}"
+        logger.warning("startup: warm-up step %s failed", step, exc_info=True)
+    finally:
+        report[step] = round((time.perf_counter() - started) * 1000, 1)
+
+
+async def configure_mappers_step():
+    configure_mappers()
+
+
+async def warm_up(app) -> dict:
+    """
+    Run the warm-up steps and return their durations in ms, with the
+    steps that failed and why under "failed". Never raises.
+    """
+    report = {"imports": round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)}
+    failed = {}
+    started = time.perf_counter()
+
+    if STARTUP_WARMUP:
+        await timed(report, failed, "mappers", configure_mappers_step())
+        # bcrypt's self-test runs on a hashing thread while the
+        # connections open
+        await asyncio.gather(
+            timed(report, failed, "crypto", hash_pool.run(load_crypto)),
+            timed(report, failed, "pool", open_pool(STARTUP_POOL_CONNECTIONS)),
+        )
+        # without connections the statements cannot run either
+        if "pool" not in failed:
+            await timed(report, failed, "statements", warm_statements(app))
+
+    report["warmup"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        "startup: %s",
+        ", ".join(f"{step} {ms:.1f}ms" for step, ms in report.items())
+    )
+    if failed:
+        logger.warning("startup: warm-up incomplete, failed: %s", ", ".join(failed))
+
+    startup_report.clear()
+    startup_report.update(report, failed=failed)
+    return startup_report
@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import mimetypes
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE = {".html", ".js", ".css", ".svg", ".json", ".txt"}
+
+# Content-hashed URLs never change, everything else must revalidate
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+STATIC_REF = re.compile(r"/static/([\w./-]+)")
+
+# appended to the content digest in the ETag of each encoded variant
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+class Asset:
+    """
+    One static file held in memory with its precompressed variants.
+    """
+
+    def __init__(self, name: str, body: bytes, mtime: float):
+        self.name = name
+        self.media_type = (
+            mimetypes.guess_type(name)[0] or "application/octet-stream"
+        )
+        if self.media_type.startswith("text/") or name.endswith(".js"):
+            self.media_type += "; charset=utf-8"
+
+        self.set_mtime(mtime)
+        self.set_body(body)
+
+    def set_mtime(self, mtime: float):
+        self.mtime = int(mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+
+    def set_body(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+
+        stem, dot, suffix = self.name.rpartition(".")
+        self.hashed_name = f"{stem}.{self.digest}.{suffix}" if dot else None
+
+        self.encoded = {}
+        if Path(self.name).suffix in COMPRESSIBLE:
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=11)
+
+        # keep a variant only if it actually saves bytes
+        self.encoded = {
+            coding: data for coding, data in self.encoded.items()
+            if len(data) < len(body)
+        }
+
+    def etag_for(self, coding: str | None):
+        """
+        Strong ETag of one variant. Each content coding is a different
+        representation, so each gets its own tag.
+        """
+        suffix = ETAG_SUFFIXES[coding] if coding else ""
+        return f'"{self.digest}{suffix}"'
+
+    def pick_coding(self, request: Request):
+        """
+        The best precompressed variant the client accepts, or None.
+        """
+        accepted = accepted_encodings(request.headers.get("accept-encoding"))
+        for coding in ("br", "gzip"):
+            if coding in accepted and coding in self.encoded:
+                return coding
+        return None
+
+
+def accepted_encodings(header: str | None):
+    """
+    Content codings from an Accept-Encoding header, minus any with q=0.
+    """
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.partition(";")
+        name, _, value = params.strip().partition("=")
+        try:
+            if name.strip() == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetStore:
+    """
+    Loads every file under a directory once and serves it from memory.
+
+    Each asset is reachable at /static/<name> (revalidated via ETag /
+    Last-Modified) and at /static/<stem>.<hash>.<ext> (cached as
+    immutable). HTML files are rewritten to use the hashed URLs.
+    """
+
+    def __init__(self, directory: Path):
+        self.assets = {}
+        self.by_hashed_name = {}
+
+        for path in sorted(directory.rglob("*")):
+            if path.is_file():
+                name = path.relative_to(directory).as_posix()
+                self.assets[name] = Asset(
+                    name, path.read_bytes(), path.stat().st_mtime
+                )
+
+        # HTML last, so it can point at the final hashes of everything else
+        for asset in sorted(self.assets.values(), key=lambda a: a.name.endswith(".html")):
+            if asset.name.endswith((".html", ".css")):
+                # the rewritten bytes change with every referenced file,
+                # so If-Modified-Since must see their changes too
+                asset.set_mtime(max(
+                    [asset.mtime] + [
+                        self.assets[ref].mtime
+                        for ref in STATIC_REF.findall(asset.body.decode("utf-8"))
+                        if ref in self.assets
+                    ]
+                ))
+                asset.set_body(self.rewrite(asset.body))
+            if asset.hashed_name:
+                self.by_hashed_name[asset.hashed_name] = asset
+
+    def url(self, name: str):
+        asset = self.assets.get(name)
+        if asset is None or asset.hashed_name is None:
+            return f"/static/{name}"
+        return f"/static/{asset.hashed_name}"
+
+    def rewrite(self, body: bytes):
+        text = body.decode("utf-8")
+        text = STATIC_REF.sub(lambda m: self.url(m.group(1)), text)
+        return text.encode("utf-8")
+
+    def lookup(self, name: str):
+        """
+        Return (asset, immutable) for a plain or hashed name.
+        """
+        if name in self.by_hashed_name:
+            return self.by_hashed_name[name], True
+        return self.assets.get(name), False
+
+    def response(self, request: Request, asset: Asset, immutable: bool = False):
+        coding = asset.pick_coding(request)
+        etag = asset.etag_for(coding)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": IMMUTABLE if immutable else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        if not_modified(request, asset, etag):
+            return Response(status_code=304, headers=headers)
+
+        if coding is None:
+            return Response(asset.body, media_type=asset.media_type, headers=headers)
+
+        headers["Content-Encoding"] = coding
+        return Response(
+            asset.encoded[coding],
+            media_type=asset.media_type,
+            headers=headers
+        )
+
+
+def not_modified(request: Request, asset: Asset, etag: str):
+    """
+    Whether the client's copy is current. If-None-Match is compared
+    with the ETag of the variant that would be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return asset.mtime <= since
+
+    return False
@@ -0,0 +1,66 @@
+import hashlib
+
+from sqlalchemy import select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.todo import Todo
+from app.models.todo_share import TodoShare
+from app.models.user import User
+
+# Clients must revalidate, which they do with If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_user_versions(db: AsyncSession, user_ids):
+    """
+    Mark what these users see as changed. Runs inside the
+    caller's transaction.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id.in_(list(user_ids)))
+        .values(change_version=User.change_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def bump_task_versions(db: AsyncSession, task_ids):
+    """
+    Mark the task lists of the owners and sharees of these tasks
+    as changed. Runs inside the caller's transaction.
+    """
+    task_ids = list(task_ids)
+    affected = union(
+        select(Todo.user_id).where(Todo.id.in_(task_ids)),
+        select(TodoShare.user_id).where(TodoShare.todo_id.in_(task_ids))
+    )
+    await db.execute(
+        update(User)
+        .where(User.id.in_(affected))
+        .values(change_version=User.change_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def make_etag(*parts):
+    """
+    Weak ETag from a resource name, user id, version and any
+    request parameters that shape the representation.
+    """
+    raw = ":".join(str(part) for part in parts)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str):
+    """
+    Weak comparison of an If-None-Match header against `etag`.
+    """
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+
+    return etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
@@ -1,2 +1,8 @@
 from app.database.base import Base
-from app.database.engine import engine, SessionLocal
+from app.database.engine import (
+    engine,
+    SessionLocal,
+    async_engine,
+    AsyncSessionLocal,
+    pool_status,
+)
@@ -1,14 +1,87 @@
 import os
+import orjson
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 
-load_dotenv()
+from app.core import config  # noqa: F401  loads .env before any setting is read
+from app.core.metrics import instrument_engine
+from app.database.pool import (
+    PoolStats,
+    instrumented_pool_class,
+    attach_pool_stats,
+)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool settings, applied per engine (so per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in (
+    "1", "true", "yes"
+)
+
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+
+def to_async_url(url: str):
+    """
+    Rewrite DATABASE_URL so it points at an async driver.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+
+    return url
+
+
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
+
 engine = create_engine(
-    DATABASE_URL
+    DATABASE_URL,
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_stats),
+    json_deserializer=orjson.loads,
+    **POOL_OPTIONS
 )
+attach_pool_stats(engine, sync_pool_stats)
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(bind=engine)
+
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_stats),
+    json_deserializer=orjson.loads,
+    **POOL_OPTIONS
+)
+attach_pool_stats(async_engine.sync_engine, async_pool_stats)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    expire_on_commit=False
+)
+
+
+def pool_status():
+    """
+    Current pool counters for both engines.
+    """
+    return {
+        "settings": POOL_OPTIONS,
+        "async": async_pool_stats.snapshot(),
+        "sync": sync_pool_stats.snapshot(),
+    }
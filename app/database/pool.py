@@ -0,0 +1,115 @@
+import time
+from threading import Lock
+
+from sqlalchemy import event, exc
+
+from app.core.metrics import observe_pool_wait
+
+
+class PoolStats:
+    """
+    Counters for one connection pool, fed by pool events.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.in_use = 0
+        self.in_use_peak = 0
+        self.overflow_peak = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def on_checkout(self, *_):
+        with self._lock:
+            self.in_use += 1
+            self.in_use_peak = max(self.in_use_peak, self.in_use)
+            if self.pool is not None:
+                self.overflow_peak = max(
+                    self.overflow_peak, self.pool.overflow()
+                )
+
+    def on_checkin(self, *_):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def snapshot(self):
+        pool = self.pool
+        return {
+            "pool_size": pool.size() if pool else None,
+            "checked_in": pool.checkedin() if pool else None,
+            "checked_out": pool.checkedout() if pool else None,
+            "overflow": max(pool.overflow(), 0) if pool else None,
+            "in_use": self.in_use,
+            "in_use_peak": self.in_use_peak,
+            "overflow_peak": self.overflow_peak,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000
+                if self.checkouts else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+class TimedCheckoutMixin:
+    """
+    Times every connection checkout, including time spent
+    queueing for a free slot and pool timeouts.
+    """
+
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        waited = time.perf_counter() - start
+        self.stats.record_wait(waited)
+        observe_pool_wait(waited)
+        return conn
+
+
+def instrumented_pool_class(pool_cls, stats: PoolStats):
+    """
+    Return a subclass of `pool_cls` that reports into `stats`.
+
+    A subclass (rather than a wrapped instance) keeps working when
+    the engine recreates its pool on dispose().
+    """
+    return type(
+        f"Instrumented{pool_cls.__name__}",
+        (TimedCheckoutMixin, pool_cls),
+        {"stats": stats},
+    )
+
+
+def attach_pool_stats(sync_engine, stats: PoolStats):
+    """
+    Register checkout/checkin listeners for `stats` on an engine's pool.
+    """
+    stats.pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "engine_disposed")
+    def _track_new_pool(engine):
+        stats.pool = engine.pool
+
+    event.listen(sync_engine.pool, "checkout", stats.on_checkout)
+    event.listen(sync_engine.pool, "checkin", stats.on_checkin)
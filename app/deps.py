@@ -1,15 +1,31 @@
+import os
+
 from fastapi import Header, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.cache import TTLCache
+from app.core.events import task_events
 from app.core.security import decode_token
 from app.models.todo import Todo
 from app.models.todo_share import TodoShare
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 security = HTTPBearer()
 
+PERMISSION_CACHE_ENABLED = os.getenv(
+    "PERMISSION_CACHE_ENABLED", "true"
+).lower() in ("1", "true", "yes")
+
+permission_cache = TTLCache(
+    "permissions",
+    maxsize=int(os.getenv("PERMISSION_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("PERMISSION_CACHE_TTL", 60)),
+    enabled=PERMISSION_CACHE_ENABLED,
+)
 
-def get_current_user(
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     token = credentials.credentials
@@ -30,7 +46,7 @@ def get_current_user(
     return payload
 
 
-def require_admin(payload: dict = Depends(get_current_user)):
+async def require_admin(payload: dict = Depends(get_current_user)):
     if payload.get("role") != "admin":
         raise HTTPException(
             status_code=403,
@@ -39,25 +55,71 @@ def require_admin(payload: dict = Depends(get_current_user)):
 
     return payload
 
-def get_task_permission(
+async def get_task_permission(
     task_id: int,
     user_id: int,
-    db: Session
+    db: AsyncSession
 ):
-    task = db.query(Todo).filter(Todo.id == task_id).first()
-    if not task:
-        raise HTTPException(404, "Task not found")
+    """
+    Return "owner", "editor" or "viewer" for a live task.
 
-    if task.user_id == user_id:
-        return "owner"
+    Positive answers are cached per (task_id, user_id); callers
+    that change access must call invalidate_task_permissions, and
+    other workers evict on the task's change notification.
+    """
+    key = (task_id, user_id)
+    permission = permission_cache.get(key)
+    if permission:
+        return permission
 
-    share = db.query(TodoShare).filter(
-        TodoShare.todo_id == task_id,
-        TodoShare.user_id == user_id
+    generation = permission_cache.generation
+
+    row = (
+        await db.execute(
+            select(Todo.user_id, TodoShare.permission)
+            .outerjoin(
+                TodoShare,
+                (TodoShare.todo_id == Todo.id) & (TodoShare.user_id == user_id)
+            )
+            .where(Todo.id == task_id, Todo.is_deleted == False)
+        )
     ).first()
 
-    if not share:
+    if not row:
+        raise HTTPException(404, "Task not found")
+
+    owner_id, share_permission = row
+
+    if owner_id == user_id:
+        permission = "owner"
+    elif share_permission:
+        permission = share_permission
+    else:
         raise HTTPException(403, "No access to this task")
 
+    permission_cache.set(key, permission, generation=generation)
+    return permission
+
+
+def invalidate_task_permissions(task_id: int, user_id: int | None = None):
+    """
+    Drop cached permissions for a task, or for one user on it.
+    """
+    if user_id is not None:
+        permission_cache.delete((task_id, user_id))
+    else:
+        permission_cache.delete_where(lambda key: key[0] == task_id)
+
+
+def evict_task_permissions(task_id: int | None):
+    """
+    Task event hub access listener: drop what a change made in any
+    worker may have made stale, or everything if unsure (None).
+    """
+    if task_id is None:
+        permission_cache.clear()
+    else:
+        invalidate_task_permissions(task_id)
+
 
-    return share.permission
+task_events.access_listeners.append(evict_task_permissions)
@@ -1,9 +1,43 @@
-from sqlalchemy import Column, Integer, String
+import enum
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from app.database.base import Base
 
+
+class AuditAction(str, enum.Enum):
+    TASK_DELETE = "task.delete"
+    TASK_RESTORE = "task.restore"
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True)
-    action = Column(String)
-    admin_email = Column(String)
+    id = Column(BigInteger, primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    actor_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    # stored as text so new actions need no enum migration
+    action = Column(
+        Enum(AuditAction, native_enum=False, length=32,
+             values_callable=lambda actions: [a.value for a in actions]),
+        nullable=False
+    )
+    target_type = Column(String(32))
+    target_id = Column(Integer)
+    detail = Column(JSONB)
+
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", "created_at", "id"),
+        Index("ix_audit_logs_actor", "actor_id", "created_at", "id"),
+        Index("ix_audit_logs_target", "target_type", "target_id", "created_at", "id"),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+from app.database.base import Base
+
+# Login sessions revoked at logout, by sid (tokens issued before sids
+# existed, by jti). Workers hold the live rows in memory
+# (app.core.revocation); expired ones are deleted.
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Computed, DateTime, Integer, String, Boolean, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.database.base import Base
 
 class Todo(Base):
@@ -11,3 +12,20 @@ class Todo(Base):
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
     is_deleted = Column(Boolean, default=False)
+    deleted_at = Column(DateTime(timezone=True))
+
+    # kept in step with title by Postgres on every insert/update
+    search_vector = Column(
+        TSVECTOR,
+        Computed("to_tsvector('english'::regconfig, coalesce(title, ''))", persisted=True)
+    )
+
+    __table_args__ = (
+        # live tasks of one user in id order: GET /tasks, ownership checks
+        Index("ix_todos_user_id_live", "user_id", "id", postgresql_where=text("NOT is_deleted")),
+        # purge candidates, oldest first
+        Index("ix_todos_deleted_at", "deleted_at", postgresql_where=text("is_deleted")),
+        # title search (q=); the pg_trgm index for substrings is created
+        # by the migration only where the extension is available
+        Index("ix_todos_search_vector", "search_vector", postgresql_using="gin", postgresql_where=text("NOT is_deleted")),
+    )
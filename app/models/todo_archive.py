@@ -0,0 +1,19 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database.base import Base
+
+# Soft-deleted todos moved out of the hot tables by the purge job,
+# with their shares, so an admin can still restore them.
+class TodoArchive(Base):
+    __tablename__ = "todos_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # the original todos.id
+    title = Column(String, nullable=False)
+    priority = Column(String, nullable=False)
+    completed = Column(Boolean)
+    user_id = Column(Integer, index=True)
+    deleted_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # [{"user_id": ..., "permission": ...}]
+    shares = Column(JSONB, nullable=False, server_default="[]")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, ForeignKey, UniqueConstraint
 from app.database.base import Base
 
 class TodoShare(Base):
@@ -12,4 +12,6 @@ class TodoShare(Base):
 
     __table_args__ = (
         UniqueConstraint("todo_id", "user_id"),
+        # tasks shared with a user; the unique constraint leads with todo_id
+        Index("ix_todo_shares_user_id_todo_id", "user_id", "todo_id"),
     )
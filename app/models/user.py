@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, Index, Integer, String, func
 from app.database.base import Base
 
 class User(Base):
@@ -9,3 +9,18 @@ class User(Base):
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
     role = Column(String, default="user")
+
+    # bumped whenever this user's task list changes (GET /tasks ETag)
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        # case-insensitive email lookups (admin task search) and, with
+        # the pattern opclass, email prefix ranges (admin user listing)
+        Index(
+            "ix_users_email_lower_pattern",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        # admin user listing filtered by role, in id order
+        Index("ix_users_role_id", role, id),
+    )
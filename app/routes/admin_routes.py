@@ -1,129 +1,529 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, aliased
-from sqlalchemy import or_
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy import (
+    JSON, delete, func, insert, literal, select, tuple_, union, union_all, update
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
+from app.core.audit import audit
+from app.core.cache import cache_stats
+from app.core.events import notify_task_changes, task_events
+from app.core.hashing import hash_pool
+from app.core.pagination import encode_cursor, decode_cursor, estimate_rows
+from app.core.responses import rows_as_dicts
+from app.core.revocation import revocations
+from app.core.search import substring_search_enabled, title_search
+from app.core.startup import startup_report
+from app.core.versions import bump_task_versions
+from app.database import pool_status
 from app.database.session import get_db
 from app.models.user import User
 from app.models.todo import Todo
+from app.models.todo_archive import TodoArchive
 from app.models.todo_share import TodoShare
-from app.deps import require_admin
-from app.models.audit_log import AuditLog
+from app.deps import require_admin, invalidate_task_permissions
+from app.models.audit_log import AuditAction, AuditLog
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+def prefix_upper_bound(prefix: str) -> str | None:
+    """
+    The smallest string above every string starting with `prefix`,
+    in code point order, or None if there is none (all U+10FFFF).
+    Surrogates are skipped; they cannot be encoded.
+    """
+    prefix = prefix.rstrip("\U0010ffff")
+    if not prefix:
+        return None
+
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
 @router.get("/users")
-def get_all_users(
-    page: int = 1,
-    limit: int = 10,
+async def get_all_users(
+    role: str | None = Query(None, max_length=50),
+    email_prefix: str | None = Query(None, min_length=1, max_length=254),
+    include_counts: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     _: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Admin endpoint to fetch all users.
+    Admin endpoint to fetch users in id order.
 
-    Supports pagination.
-    Admin access only.
+    Filters: role and a case-insensitive email prefix.
+    `include_counts` adds each user's live tasks and the
+    tasks shared with them.
+    Pass `next_cursor` back as `cursor` to get the next page.
+    `estimated_total` is the planner's estimate of the
+    matching users, exact when everything fits on one page.
     """
-    offset = (page - 1) * limit
-    return (
-        db.query(User)
-        .offset(offset)
-        .limit(limit)
-        .all()
+    filters = []
+    if role is not None:
+        filters.append(User.role == role)
+    if email_prefix:
+        # a range rather than LIKE, so even a generic plan of the
+        # prepared statement can use ix_users_email_lower_pattern
+        low = email_prefix.lower()
+        email = func.lower(User.email)
+        filters.append(email.op("~>=~")(low))
+        high = prefix_upper_bound(low)
+        if high is not None:
+            filters.append(email.op("~<~")(high))
+
+    page_filters = list(filters)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if type(last_id) is not int:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_filters.append(User.id > last_id)
+
+    rows = rows_as_dicts(
+        await db.execute(
+            select(User.id, User.name, User.email, User.role)
+            .where(*page_filters)
+            .order_by(User.id)
+            .limit(limit + 1)
+        )
     )
 
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1]["id"])
+
+    if cursor is None and next_cursor is None:
+        estimated_total = len(items)
+    else:
+        estimated_total = await estimate_rows(db, select(User.id).where(*filters))
+
+    if include_counts and items:
+        ids = [row["id"] for row in items]
+        # one grouped pass over both tables, for this page's users only
+        owned = select(
+            Todo.user_id.label("user_id"),
+            literal(1).label("tasks"),
+            literal(0).label("shared")
+        ).where(Todo.user_id.in_(ids), Todo.is_deleted == False)
+        received = select(
+            TodoShare.user_id,
+            literal(0),
+            literal(1)
+        ).join(Todo, TodoShare.todo_id == Todo.id).where(
+            TodoShare.user_id.in_(ids), Todo.is_deleted == False
+        )
+        counted = union_all(owned, received).subquery()
+        counts = {
+            user_id: (tasks, shared)
+            for user_id, tasks, shared in (
+                await db.execute(
+                    select(
+                        counted.c.user_id,
+                        func.sum(counted.c.tasks),
+                        func.sum(counted.c.shared)
+                    ).group_by(counted.c.user_id)
+                )
+            ).all()
+        }
+        for row in items:
+            row["task_count"], row["shared_count"] = counts.get(row["id"], (0, 0))
+
+    return ORJSONResponse({
+        "items": items,
+        "next_cursor": next_cursor,
+        "estimated_total": estimated_total
+    })
+
+
+@router.get("/pool")
+async def get_pool_status(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for database connection pool metrics.
+
+    Reports pool settings, live checked-out/overflow counts,
+    peaks, checkout wait times and checkout timeouts.
+    """
+    return pool_status()
+
+
+@router.get("/caches")
+async def get_cache_stats(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for in-process cache metrics.
+
+    Reports size, hit/miss counters and evictions per cache.
+    """
+    return cache_stats()
+
+
+@router.get("/hashing")
+async def get_hash_pool_stats(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for the password hashing pool in this worker.
+
+    Reports workers, capacity, jobs in flight, completed jobs and
+    logins/registrations turned away with 503.
+    """
+    return hash_pool.stats()
+
+
+@router.get("/startup")
+async def get_startup_report(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for this worker's startup timings.
+
+    Reports milliseconds spent importing and in each warm-up step,
+    and any steps that failed.
+    """
+    return startup_report
+
+
+@router.get("/streams")
+async def get_stream_stats(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for the live task feed in this worker.
+
+    Reports listener state, open streams and delivery counters.
+    """
+    return task_events.stats()
+
+
+@router.get("/revocations")
+async def get_revocation_stats(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for the refresh token revocation list in this worker.
+
+    Reports sync state, revoked tokens held, reloads and
+    database fallbacks.
+    """
+    return revocations.stats()
+
 
 @router.get("/tasks")
-def get_all_tasks(
+async def get_all_tasks(
     search: str | None = Query(None),
+    q: str | None = Query(None, min_length=1, max_length=200),
+    completed: bool | None = None,
+    shared: bool | None = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=200),
     _: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Admin endpoint to fetch all tasks.
+    Admin endpoint to fetch all tasks, one page at a time.
 
     Includes:
     - Owner email
     - Shared users and permissions
 
-    Supports search by owner/shared user email.
-    Deleted tasks are excluded.
+    Supports search by owner/shared user email and
+    completed/shared filters. Deleted tasks are excluded.
+    `q` searches titles; matches carry a `rank` and
+    come best first.
+    The total number of matching tasks is returned
+    in the X-Total-Count header.
     """
     Owner = aliased(User)
-    SharedUser = aliased(User)
 
-    rows = (
-        db.query(Todo, Owner, TodoShare, SharedUser)
+    filters = [Todo.is_deleted == False]
+
+    if search:
+        matched_users = select(User.id).where(
+            func.lower(User.email) == search.lower()
+        )
+        # a union of task ids rather than an OR across two tables,
+        # so both sides are index lookups by user id
+        filters.append(Todo.id.in_(union(
+            select(Todo.id).where(
+                Todo.user_id.in_(matched_users),
+                Todo.is_deleted == False
+            ),
+            select(TodoShare.todo_id).where(
+                TodoShare.user_id.in_(matched_users)
+            )
+        )))
+
+    columns = [
+        Todo.id,
+        Todo.title,
+        Todo.priority,
+        Todo.completed,
+        Owner.email.label("owner_email")
+    ]
+    order_by = [Todo.id]
+
+    if q:
+        condition, rank = title_search(q, await substring_search_enabled(db))
+        filters.append(condition)
+        columns.append(rank.label("rank"))
+        order_by = [rank.desc(), Todo.id]
+
+    if completed is not None:
+        filters.append(Todo.completed == completed)
+
+    if shared is not None:
+        has_shares = select(TodoShare.id).where(
+            TodoShare.todo_id == Todo.id
+        ).exists()
+        filters.append(has_shares if shared else ~has_shares)
+
+    # Correlated subquery, only evaluated for the rows on this page
+    shared_with = (
+        select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "user_email", User.email,
+                        "permission", TodoShare.permission
+                    ),
+                    TodoShare.id
+                ),
+                type_=JSON
+            )
+        )
+        .join(User, TodoShare.user_id == User.id)
+        .where(TodoShare.todo_id == Todo.id)
+        .scalar_subquery()
+    )
+
+    total = await db.scalar(
+        select(func.count())
+        .select_from(Todo)
         .join(Owner, Todo.user_id == Owner.id)
-        .outerjoin(TodoShare, Todo.id == TodoShare.todo_id)
-        .outerjoin(SharedUser, TodoShare.user_id == SharedUser.id)
-        .filter(Todo.is_deleted == False)
-        .all()
+        .where(*filters)
     )
 
-    tasks = {}
-
-    for todo, owner, share, shared_user in rows:
-        if todo.id not in tasks:
-            tasks[todo.id] = {
-                "id": todo.id,
-                "title": todo.title,
-                "priority": todo.priority,
-                "completed": todo.completed,
-                "owner_email": owner.email,
-                "shared_with": []
-            }
-
-        if share and shared_user:
-            tasks[todo.id]["shared_with"].append({
-                "user_email": shared_user.email,
-                "permission": share.permission
-            })
-
-    result = []
-
-    for task in tasks.values():
-        if search:
-            emails = [task["owner_email"]] + [
-                s["user_email"] for s in task["shared_with"]
-            ]
-            if search.lower() not in [e.lower() for e in emails]:
-                continue
+    rows = rows_as_dicts(
+        await db.execute(
+            select(*columns, shared_with.label("shared_with"))
+            .join(Owner, Todo.user_id == Owner.id)
+            .where(*filters)
+            .order_by(*order_by)
+            .offset((page - 1) * limit)
+            .limit(limit)
+        )
+    )
 
-        result.append(task)
+    for row in rows:
+        row["shared_with"] = row["shared_with"] or []
 
-    return result
+    return ORJSONResponse(rows, headers={"X-Total-Count": str(total)})
 
 
 @router.delete("/tasks/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
     _: dict = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Admin soft delete for tasks.
 
     Marks task as deleted and records audit log.
     """
-    task = db.query(Todo).filter(
-        Todo.id == task_id,
-        Todo.is_deleted == False
+    task = (
+        await db.execute(
+            update(Todo)
+            .where(Todo.id == task_id, Todo.is_deleted == False)
+            .values(is_deleted=True, deleted_at=func.now())
+            .returning(Todo.title, Todo.user_id)
+        )
     ).first()
 
     if not task:
         raise HTTPException(404, "Task not found")
 
-    admin = db.query(User).filter(User.id == int(_["sub"])).first()
+    await bump_task_versions(db, [task_id])
+    await notify_task_changes(db, "deleted", [task_id])
+    await db.commit()
+    invalidate_task_permissions(task_id)
+
+    audit.record(
+        int(_["sub"]),
+        AuditAction.TASK_DELETE,
+        "task",
+        task_id,
+        {"title": task.title, "owner_id": task.user_id}
+    )
+    return {"status": "deleted"}
+
 
-    task.is_deleted = True
+@router.post("/tasks/{task_id}/restore")
+async def restore_task(
+    task_id: int,
+    _: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Admin restore for deleted tasks.
 
-    db.add(AuditLog(
-        action=f"Deleted task {task.id}",
-        admin_email=admin.email
-    ))
+    A task that is only soft-deleted is undeleted in place; one the
+    purge job already archived is moved back with its shares.
+    Records audit log.
+    """
+    task = (
+        await db.execute(
+            update(Todo)
+            .where(Todo.id == task_id, Todo.is_deleted == True)
+            .values(is_deleted=False, deleted_at=None)
+            .returning(Todo.id, Todo.title, Todo.priority, Todo.completed)
+        )
+    ).mappings().first()
+    restored_from = "deleted"
 
-    db.commit()
-    return {"status": "deleted"}
+    if task is None:
+        archived = (
+            await db.execute(
+                delete(TodoArchive)
+                .where(TodoArchive.id == task_id)
+                .returning(
+                    TodoArchive.title,
+                    TodoArchive.priority,
+                    TodoArchive.completed,
+                    TodoArchive.user_id,
+                    TodoArchive.shares
+                )
+            )
+        ).first()
+
+        if archived is None:
+            if await db.scalar(select(Todo.id).where(Todo.id == task_id)):
+                raise HTTPException(409, "Task is not deleted")
+            raise HTTPException(404, "Task not found")
+
+        task = (
+            await db.execute(
+                insert(Todo)
+                .values(
+                    id=task_id,
+                    title=archived.title,
+                    priority=archived.priority,
+                    completed=archived.completed,
+                    user_id=archived.user_id,
+                    is_deleted=False
+                )
+                .returning(Todo.id, Todo.title, Todo.priority, Todo.completed)
+            )
+        ).mappings().one()
+        restored_from = "archive"
+
+        sharees = {share["user_id"]: share["permission"] for share in archived.shares}
+        if sharees:
+            existing = await db.scalars(
+                select(User.id).where(User.id.in_(list(sharees)))
+            )
+            rows = [
+                {"todo_id": task_id, "user_id": user_id, "permission": sharees[user_id]}
+                for user_id in existing
+            ]
+            if rows:
+                await db.execute(insert(TodoShare), rows)
+
+    await bump_task_versions(db, [task_id])
+    await notify_task_changes(db, "restored", [task_id])
+    await db.commit()
+    invalidate_task_permissions(task_id)
+
+    audit.record(
+        int(_["sub"]),
+        AuditAction.TASK_RESTORE,
+        "task",
+        task_id,
+        {"restored_from": restored_from}
+    )
+    return {**task, "restored_from": restored_from}
+
+
+@router.get("/audit")
+async def get_audit_log(
+    actor_id: int | None = None,
+    action: AuditAction | None = None,
+    target_type: str | None = None,
+    target_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    _: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Admin endpoint to browse audit events, newest first.
+
+    Filters: actor, action, target type/id and a
+    [since, until) time range.
+    Pass `next_cursor` back as `cursor` to get the next page.
+    """
+    filters = []
+    if actor_id is not None:
+        filters.append(AuditLog.actor_id == actor_id)
+    if action is not None:
+        filters.append(AuditLog.action == action)
+    if target_type is not None:
+        filters.append(AuditLog.target_type == target_type)
+    if target_id is not None:
+        filters.append(AuditLog.target_id == target_id)
+    if since is not None:
+        filters.append(AuditLog.created_at >= since)
+    if until is not None:
+        filters.append(AuditLog.created_at < until)
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if type(last_id) is not int:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        filters.append(
+            tuple_(AuditLog.created_at, AuditLog.id) < (created_at, last_id)
+        )
+
+    rows = rows_as_dicts(
+        await db.execute(
+            select(
+                AuditLog.id,
+                AuditLog.created_at,
+                AuditLog.actor_id,
+                User.email.label("actor_email"),
+                AuditLog.action,
+                AuditLog.target_type,
+                AuditLog.target_id,
+                AuditLog.detail
+            )
+            .outerjoin(User, AuditLog.actor_id == User.id)
+            .where(*filters)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .limit(limit + 1)
+        )
+    )
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"].isoformat(), last["id"])
+
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/audit/writer")
+async def get_audit_writer_stats(_: dict = Depends(require_admin)):
+    """
+    Admin endpoint for the audit writer in this worker.
+
+    Reports buffered events, batches written, drops and failures.
+    """
+    return audit.stats()
@@ -1,50 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, Cookie
-from fastapi.responses import FileResponse, JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Cookie, Header, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.session import get_db
 
 from app.controllers.auth_controller import register_user, authenticate_user
+from app.core.hashing import HashPoolBusy, HASH_RETRY_AFTER
+from app.core.profiles import get_user_profile
+from app.core.revocation import revocations
+from app.core.versions import CACHE_CONTROL, etag_matches, make_etag
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    session_expiry,
 )
-from app.models.user import User
 from app.deps import get_current_user
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse
 
 router = APIRouter(tags=["Auth"])
 
 
-@router.get("/", include_in_schema=False)
-def index_page():
-    return FileResponse("static/index.html")
-
-
-@router.get("/login", include_in_schema=False)
-def login_page():
-    return FileResponse("static/login.html")
-
-
-@router.get("/register", include_in_schema=False)
-def register_page():
-    return FileResponse("static/register.html")
-
-@router.get("/admin", include_in_schema=False)
-def admin_page():
-    return FileResponse("static/admin.html")
+def hashing_busy():
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, try again shortly",
+        headers={"Retry-After": str(HASH_RETRY_AFTER)}
+    )
 
 
 @router.post("/register")
-def register(
+async def register(
     data: RegisterRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        user = register_user(db, data.name, data.email, data.password)
+        user = await register_user(db, data.name, data.email, data.password)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HashPoolBusy:
+        raise hashing_busy()
 
     if not user:
         raise HTTPException(status_code=400, detail="Registration failed")
@@ -53,18 +48,22 @@ def register(
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """
     Authenticate user and return access & refresh tokens.
     """
-    user = authenticate_user(db, data.email, data.password)
+    try:
+        user = await authenticate_user(db, data.email, data.password)
+    except HashPoolBusy:
+        raise hashing_busy()
+
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     access_token = create_access_token(user.id,user.role)
     refresh_token = create_refresh_token(user.id,user.role)
 
-    response = JSONResponse(
+    response = ORJSONResponse(
         {
             "access_token": access_token,
             "token_type": "bearer",
@@ -83,9 +82,14 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh")
-def refresh(refresh_token: str = Cookie(None)):
+async def refresh(refresh_token: str = Cookie(None)):
     """
-    Generate a new access token using a valid refresh token.
+    Generate a new access token and rotate the refresh token.
+
+    The new refresh token keeps the session (sid) of the one
+    presented. Revocation is per session, at logout, so the check is
+    an in-memory lookup and a refresh writes nothing; a worker whose
+    revocation list is out of sync falls back to the table.
     """
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Refresh token missing")
@@ -96,11 +100,16 @@ def refresh(refresh_token: str = Cookie(None)):
 
     user_id = int(payload["sub"])
     role = payload["role"]
+    sid = payload.get("sid")
+
+    # tokens issued before sids existed were revoked by jti
+    if await revocations.is_revoked(sid or payload.get("jti")):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
 
     new_access = create_access_token(user_id, role)
-    new_refresh = create_refresh_token(user_id, role)
+    new_refresh = create_refresh_token(user_id, role, sid)
 
-    response = JSONResponse(
+    response = ORJSONResponse(
         {
             "access_token": new_access,
             "token_type": "bearer",
@@ -119,22 +128,54 @@ def refresh(refresh_token: str = Cookie(None)):
 
 
 @router.post("/logout")
-def logout():
-    res = JSONResponse({"success": True})
+async def logout(
+    refresh_token: str = Cookie(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revoke the refresh token's session, if any, and clear its cookie.
+    Every token rotated from the same login stops working.
+    """
+    payload = decode_token(refresh_token) if refresh_token else None
+    if payload and payload.get("type") == "refresh":
+        if payload.get("sid"):
+            key, exp = payload["sid"], session_expiry()
+        else:
+            key, exp = payload.get("jti"), payload["exp"]
+
+        if key:
+            await revocations.revoke(db, key, int(payload["sub"]), exp)
+            await db.commit()
+            # seen by this worker without waiting for the notification
+            revocations.remember(key, exp)
+
+    res = ORJSONResponse({"success": True})
     res.delete_cookie("refresh_token")
     return res
 
 
 @router.get("/me")
-def me(
+async def me(
+    if_none_match: str | None = Header(None),
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Return current authenticated user's profile information.
+    Answers a matching If-None-Match with 304.
     """
     user_id = int(payload["sub"])
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await get_user_profile(db, user_id)
     if not user:
         raise HTTPException(status_code=404)
-    return {"name": user.name, "email": user.email, "role": user.role}
+
+    etag = make_etag("me", user.id, user.name, user.email, user.role)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return ORJSONResponse(
+        {"name": user.name, "email": user.email, "role": user.role},
+        headers=headers
+    )
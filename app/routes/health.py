@@ -1,40 +1,60 @@
 from fastapi import APIRouter, status, HTTPException
-from sqlalchemy import text
-from sqlalchemy.exc import SQLAlchemyError
+from fastapi.responses import ORJSONResponse
 
-from app.database.session import SessionLocal
+from app.core.health import db_pinger
 
 router = APIRouter(tags=["Health"])
 
 
+@router.get(
+    "/health/live",
+    status_code=status.HTTP_200_OK,
+    summary="Liveness probe",
+    description="Answers as long as the process serves requests; no I/O"
+)
+async def live():
+    return {"status": "ok"}
+
+
+@router.get(
+    "/health/ready",
+    summary="Readiness probe",
+    description="Database state from the background pinger, with pool utilisation"
+)
+async def ready():
+    """
+    503 while the last successful database ping is stale.
+    Served from memory, so probes add no load to the database.
+    """
+    state = db_pinger.state()
+    up = state["database"] == "up"
+    return ORJSONResponse(
+        {"status": "ok" if up else "unavailable", **state},
+        status_code=status.HTTP_200_OK if up else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
 @router.get(
     "/health",
     status_code=status.HTTP_200_OK,
     summary="Service health check",
     description="Verifies application liveness and database connectivity"
 )
-def health_check():
+async def health_check():
     """
     Health check endpoint used for monitoring, load balancers,
     and container orchestration platforms.
+
+    Reads the background pinger's state like /health/ready.
     """
-    db = None
-    try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-
-        return {
-            "status": "ok",
-            "service": "todo-api",
-            "database": "up"
-        }
-
-    except SQLAlchemyError:
+    if not db_pinger.up:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database unavailable"
         )
 
-    finally:
-        if db:
-            db.close()
+    return {
+        "status": "ok",
+        "service": "todo-api",
+        "database": "up"
+    }
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.static_assets import AssetStore
+
+STATIC_DIR = Path(__file__).resolve().parents[2] / "static"
+
+router = APIRouter(include_in_schema=False)
+
+# Read, rewritten and compressed once at startup
+assets = AssetStore(STATIC_DIR)
+
+
+@router.get("/")
+async def index_page(request: Request):
+    return assets.response(request, assets.assets["index.html"])
+
+
+@router.get("/login")
+async def login_page(request: Request):
+    return assets.response(request, assets.assets["login.html"])
+
+
+@router.get("/register")
+async def register_page(request: Request):
+    return assets.response(request, assets.assets["register.html"])
+
+
+@router.get("/admin")
+async def admin_page(request: Request):
+    return assets.response(request, assets.assets["admin.html"])
+
+
+@router.get("/static/{name:path}")
+async def static_file(name: str, request: Request):
+    """
+    Serve a static file from memory. Content-hashed names are
+    cached as immutable; plain names revalidate.
+    """
+    asset, immutable = assets.lookup(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    return assets.response(request, asset, immutable=immutable)
@@ -1,76 +1,235 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    String,
+    and_,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import Values
 
 from app.database.session import get_db
 from app.models.todo import Todo
 from app.models.todo_share import TodoShare   
 from app.models.user import User              
-from app.deps import get_current_user
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
+from app.core.events import notify_task_changes, task_events
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.profiles import get_user_profile_by_email, get_user_profiles_by_email
+from app.core.search import substring_search_enabled, title_search
+from app.core.responses import rows_as_dicts
+from app.core.versions import (
+    CACHE_CONTROL,
+    bump_task_versions,
+    bump_user_versions,
+    etag_matches,
+    make_etag,
+)
+from app.deps import (
+    get_current_user,
+    get_task_permission,
+    invalidate_task_permissions,
+)
+from app.schemas.todo import (
+    TodoCreate,
+    TodoUpdate,
+    TodoPatch,
+    TodoResponse,
+    TodoBatchCreate,
+    TodoBatchUpdate,
+    TodoBatchDelete,
+    TodoBulkShare,
+    TodoBulkRevoke,
+)
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+TASK_COLUMNS = (Todo.id, Todo.title, Todo.priority, Todo.completed)
+
+
+def visible_tasks(
+    user_id: int,
+    completed: bool | None = None,
+    priority: str | None = None,
+    permission: str | None = None,
+    q: str | None = None,
+    substring: bool = False
+):
+    """
+    Owned and shared tasks for a user as one UNION ALL subquery
+    with columns id, title, priority, completed, permission,
+    plus rank when searching with `q`.
+
+    Filters are applied inside each branch so both sides can use
+    their user_id indexes; a permission filter drops the branch
+    that cannot match.
+    """
+    columns = TASK_COLUMNS
+    filters = [Todo.is_deleted == False]
+    if completed is not None:
+        filters.append(Todo.completed == completed)
+    if priority is not None:
+        filters.append(Todo.priority == priority)
+    if q:
+        condition, rank = title_search(q, substring)
+        filters.append(condition)
+        columns = (*columns, rank.label("rank"))
+
+    branches = []
+
+    if permission in (None, "owner"):
+        branches.append(
+            select(*columns, literal("owner").label("permission"))
+            .where(Todo.user_id == user_id, *filters)
+        )
+
+    if permission != "owner":
+        shared = (
+            select(*columns, TodoShare.permission.label("permission"))
+            .join(TodoShare, Todo.id == TodoShare.todo_id)
+            .where(
+                TodoShare.user_id == user_id,
+                Todo.user_id != user_id,
+                *filters
+            )
+        )
+        if permission:
+            shared = shared.where(TodoShare.permission == permission)
+        branches.append(shared)
+
+    if len(branches) == 1:
+        return branches[0].subquery("tasks")
+
+    return union_all(*branches).subquery("tasks")
+
 
 @router.get("")
-def get_tasks(
+async def get_tasks(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    completed: bool | None = None,
+    priority: Literal["High", "Medium", "Low"] | None = None,
+    permission: Literal["owner", "editor", "viewer"] | None = None,
+    q: str | None = Query(None, min_length=1, max_length=200),
+    if_none_match: str | None = Header(None),
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Fetch all tasks visible to the current user.
+    Fetch tasks visible to the current user, one page at a time.
 
     Includes:
     - Tasks owned by the user
     - Tasks shared with the user (viewer/editor)
 
     Deleted tasks are excluded.
+    Filters: completed, priority, permission.
+    `q` searches titles by word or phrase, and by substring where
+    pg_trgm is installed; matches carry a `rank` and come best first.
+    Results are ordered by task id; pass `next_cursor`
+    back as `cursor` to get the next page.
+
+    Responses carry an ETag built from the user's change version;
+    a matching If-None-Match gets a 304 without running the task query.
     """
     user_id = int(payload["sub"])
 
-    response = []
+    version = await db.scalar(
+        select(User.change_version).where(User.id == user_id)
+    )
+    etag = make_etag(
+        "tasks", user_id, version,
+        limit, cursor, completed, priority, permission, q
+    )
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
 
-    owned = (
-        db.query(Todo)
-        .filter(
-            Todo.user_id == user_id,
-            Todo.is_deleted == False
-        )
-        .all()
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    tasks = visible_tasks(
+        user_id, completed, priority, permission, q,
+        substring=bool(q) and await substring_search_enabled(db)
     )
-    for t in owned:
-        response.append({
-            "id": t.id,
-            "title": t.title,
-            "priority": t.priority,
-            "completed": t.completed,
-            "permission": "owner"
-        })
-
-    shared = (
-        db.query(Todo, TodoShare.permission)
-        .join(TodoShare, Todo.id == TodoShare.todo_id)
-        .filter( TodoShare.user_id == user_id,
-            Todo.is_deleted == False)
-        .all()
+
+    if q:
+        query = select(tasks).order_by(tasks.c.rank.desc(), tasks.c.id)
+        if cursor:
+            after_rank, after_id = decode_cursor(cursor, 2)
+            if not (
+                type(after_rank) in (int, float)
+                and type(after_id) is int
+            ):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(or_(
+                tasks.c.rank < after_rank,
+                and_(tasks.c.rank == after_rank, tasks.c.id > after_id)
+            ))
+    else:
+        query = select(tasks).order_by(tasks.c.id)
+        if cursor:
+            (after_id,) = decode_cursor(cursor, 1)
+            # not isinstance: JSON true/false decode to bool, an int subclass
+            if type(after_id) is not int:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tasks.c.id > after_id)
+
+    rows = rows_as_dicts(await db.execute(query.limit(limit + 1)))
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = (
+            encode_cursor(last["rank"], last["id"]) if q
+            else encode_cursor(last["id"])
+        )
+
+    return ORJSONResponse(
+        {"items": items, "next_cursor": next_cursor},
+        headers=headers
     )
 
-    for t, perm in shared:
-        response.append({
-            "id": t.id,
-            "title": t.title,
-            "priority": t.priority,
-            "completed": t.completed,
-            "permission": perm
-        })
 
-    return response
+@router.get("/stream")
+async def stream_tasks(payload: dict = Depends(get_current_user)):
+    """
+    Live feed of changes to the tasks the current user can see,
+    as Server-Sent Events with one JSON delta per event.
+
+    created/updated/shared/restored events carry the task as this user
+    sees it, including their permission; deleted/unshared events
+    for a user who lost the task carry only its id. "ready" is
+    sent once the feed is live and "resync" when deltas may have
+    been missed; clients reload the list on both.
+    """
+    user_id = int(payload["sub"])
+
+    return StreamingResponse(
+        task_events.stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("", response_model=TodoResponse)
-def create_task(
+async def create_task(
     data: TodoCreate,
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new task for the logged-in user.
@@ -78,25 +237,334 @@ def create_task(
     """
     user_id = int(payload["sub"])
 
-    todo = Todo(
-        title=data.title,
-        priority=data.priority,
-        completed=False,
-        user_id=user_id,
-        is_deleted=False
-    )
-    db.add(todo)
-    db.commit()
-    db.refresh(todo)
+    todo = (
+        await db.execute(
+            insert(Todo)
+            .values(
+                title=data.title,
+                priority=data.priority,
+                completed=False,
+                user_id=user_id,
+                is_deleted=False
+            )
+            .returning(*TASK_COLUMNS)
+        )
+    ).mappings().one()
+    await bump_user_versions(db, [user_id])
+    await notify_task_changes(db, "created", [todo["id"]])
+    await db.commit()
     return todo
 
 
+def can_edit(user_id: int):
+    """
+    WHERE condition: the user owns the task or holds an editor share.
+    """
+    return or_(
+        Todo.user_id == user_id,
+        select(TodoShare.id).where(
+            TodoShare.todo_id == Todo.id,
+            TodoShare.user_id == user_id,
+            TodoShare.permission == "editor"
+        ).exists()
+    )
+
+
+async def apply_task_update(
+    db: AsyncSession,
+    task_id: int,
+    user_id: int,
+    values: dict
+):
+    """
+    Update a task in one UPDATE ... RETURNING statement.
+
+    The owner/editor check is part of the WHERE clause; only when
+    no row comes back is a second query run to tell 404 from 403.
+    """
+    criteria = (Todo.id == task_id, Todo.is_deleted == False, can_edit(user_id))
+
+    if values:
+        stmt = (
+            update(Todo)
+            .where(*criteria)
+            .values(**values)
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(*TASK_COLUMNS).where(*criteria)
+
+    todo = (await db.execute(stmt)).mappings().first()
+
+    if todo:
+        if values:
+            await bump_task_versions(db, [task_id])
+            await notify_task_changes(db, "updated", [task_id])
+        await db.commit()
+        return todo
+
+    found = await db.scalar(
+        select(Todo.id).where(Todo.id == task_id, Todo.is_deleted == False)
+    )
+    if found is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    raise HTTPException(status_code=403, detail="Edit not allowed")
+
+
+async def task_access(db: AsyncSession, task_ids, user_id: int):
+    """
+    One query for the current state of many live tasks and the
+    user's permission on each: {task_id: (row, permission)}.
+    Permission is None when the user has no access.
+    """
+    rows = (
+        await db.execute(
+            select(
+                Todo.id,
+                Todo.title,
+                Todo.priority,
+                Todo.completed,
+                Todo.user_id,
+                TodoShare.permission
+            )
+            .outerjoin(
+                TodoShare,
+                (TodoShare.todo_id == Todo.id) & (TodoShare.user_id == user_id)
+            )
+            .where(Todo.id.in_(task_ids), Todo.is_deleted == False)
+        )
+    ).all()
+
+    return {
+        row.id: (row, "owner" if row.user_id == user_id else row.permission)
+        for row in rows
+    }
+
+
+def item_error(task_id: int, status_code: int, detail: str):
+    return {
+        "id": task_id,
+        "status": "error",
+        "status_code": status_code,
+        "detail": detail
+    }
+
+
+@router.post("/batch")
+async def create_tasks_batch(
+    data: TodoBatchCreate,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many tasks for the logged-in user in one statement.
+    """
+    user_id = int(payload["sub"])
+
+    rows = (
+        await db.execute(
+            insert(Todo).returning(
+                Todo.id, Todo.title, Todo.priority, Todo.completed,
+                sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "title": task.title,
+                    "priority": task.priority,
+                    "completed": False,
+                    "user_id": user_id,
+                    "is_deleted": False
+                }
+                for task in data.tasks
+            ]
+        )
+    ).mappings().all()
+    await bump_user_versions(db, [user_id])
+    await notify_task_changes(db, "created", [row["id"] for row in rows])
+    await db.commit()
+
+    return {
+        "results": [
+            {"index": index, "status": "created", "task": dict(row)}
+            for index, row in enumerate(rows)
+        ]
+    }
+
+
+@router.patch("/batch")
+async def update_tasks_batch(
+    data: TodoBatchUpdate,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update many tasks in one transaction.
+
+    Each item carries the task id and the fields to change.
+    Owner and editor may edit; results are reported per item.
+    """
+    user_id = int(payload["sub"])
+
+    # last item wins if an id is repeated
+    patches = {
+        item.id: item.model_dump(exclude={"id"}, exclude_none=True)
+        for item in data.tasks
+    }
+
+    access = await task_access(db, list(patches), user_id)
+
+    results = {}
+    updates = []
+
+    for task_id, changes in patches.items():
+        if task_id not in access:
+            results[task_id] = item_error(task_id, 404, "Task not found")
+            continue
+
+        row, permission = access[task_id]
+        if permission not in ("owner", "editor"):
+            results[task_id] = item_error(task_id, 403, "Edit not allowed")
+            continue
+
+        task = {
+            "id": row.id,
+            "title": row.title,
+            "priority": row.priority,
+            "completed": row.completed,
+            **changes
+        }
+        if changes:
+            updates.append((
+                task_id,
+                changes.get("title"),
+                changes.get("priority"),
+                changes.get("completed")
+            ))
+
+        results[task_id] = {"id": task_id, "status": "updated", "task": task}
+
+    if updates:
+        # one UPDATE ... FROM (VALUES ...); as in apply_task_update the
+        # access check is repeated in its WHERE, so a share revoked or
+        # a task deleted since task_access() ran is not written
+        patch = Values(
+            column("id", Integer),
+            column("title", String),
+            column("priority", String),
+            column("completed", Boolean),
+            name="patch"
+        ).data(updates)
+        updated = (
+            await db.execute(
+                update(Todo)
+                .where(
+                    Todo.id == patch.c.id,
+                    Todo.is_deleted == False,
+                    can_edit(user_id)
+                )
+                .values(
+                    title=func.coalesce(patch.c.title, Todo.title),
+                    priority=func.coalesce(patch.c.priority, Todo.priority),
+                    # a column left NULL in every row comes back as text
+                    completed=func.coalesce(cast(patch.c.completed, Boolean), Todo.completed)
+                )
+                .returning(*TASK_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+        ).mappings().all()
+
+        updated_ids = [task["id"] for task in updated]
+        for task in updated:
+            results[task["id"]]["task"] = dict(task)
+
+        lost = {task_id for task_id, *_ in updates} - set(updated_ids)
+        if lost:
+            live = set(
+                await db.scalars(
+                    select(Todo.id).where(Todo.id.in_(lost), Todo.is_deleted == False)
+                )
+            )
+            for task_id in lost:
+                results[task_id] = (
+                    item_error(task_id, 403, "Edit not allowed") if task_id in live
+                    else item_error(task_id, 404, "Task not found")
+                )
+
+        if updated_ids:
+            await bump_task_versions(db, updated_ids)
+            await notify_task_changes(db, "updated", updated_ids)
+            await db.commit()
+
+    return {"results": list(results.values())}
+
+
+@router.delete("/batch")
+async def delete_tasks_batch(
+    data: TodoBatchDelete,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Soft delete many tasks in one statement.
+
+    Only the owner can delete; results are reported per item.
+    """
+    user_id = int(payload["sub"])
+
+    task_ids = list(dict.fromkeys(data.ids))
+    access = await task_access(db, task_ids, user_id)
+
+    results = {}
+    deletable = []
+
+    for task_id in task_ids:
+        if task_id not in access:
+            results[task_id] = item_error(task_id, 404, "Task not found")
+        elif access[task_id][1] != "owner":
+            results[task_id] = item_error(task_id, 403, "Only owner can delete")
+        else:
+            deletable.append(task_id)
+            results[task_id] = {"id": task_id, "status": "deleted"}
+
+    if deletable:
+        # a task deleted by a concurrent request since task_access() ran
+        # keeps its deleted_at and is reported as not found
+        deleted_ids = list(
+            await db.scalars(
+                update(Todo)
+                .where(
+                    Todo.id.in_(deletable),
+                    Todo.user_id == user_id,
+                    Todo.is_deleted == False
+                )
+                .values(is_deleted=True, deleted_at=func.now())
+                .returning(Todo.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+
+        for task_id in set(deletable) - set(deleted_ids):
+            results[task_id] = item_error(task_id, 404, "Task not found")
+
+        if deleted_ids:
+            await bump_task_versions(db, deleted_ids)
+            await notify_task_changes(db, "deleted", deleted_ids)
+            await db.commit()
+
+            for task_id in deleted_ids:
+                invalidate_task_permissions(task_id)
+
+    return {"results": list(results.values())}
+
+
 @router.put("/{task_id}", response_model=TodoResponse)
-def update_task(
+async def update_task(
     task_id: int,
     data: TodoUpdate,
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing task.
@@ -108,41 +576,33 @@ def update_task(
     """
     user_id = int(payload["sub"])
 
-    todo = (
-        db.query(Todo)
-        .filter(
-            Todo.id == task_id,
-            Todo.is_deleted == False
-        )
-        .first()
-    )
+    return await apply_task_update(db, task_id, user_id, data.model_dump())
 
-    if not todo:
-        raise HTTPException(status_code=404, detail="Task not found")
 
-    if todo.user_id != user_id:
-        share = db.query(TodoShare).filter(
-            TodoShare.todo_id == task_id,
-            TodoShare.user_id == user_id,
-            TodoShare.permission == "editor"
-        ).first()
+@router.patch("/{task_id}", response_model=TodoResponse)
+async def patch_task(
+    task_id: int,
+    data: TodoPatch,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Partially update a task; only the given fields change.
 
-        if not share:
-            raise HTTPException(status_code=403, detail="Edit not allowed")
+    Same rules as PUT: owner and editor can edit.
+    """
+    user_id = int(payload["sub"])
 
-    todo.title = data.title
-    todo.priority = data.priority
-    todo.completed = data.completed
-    db.commit()
-    db.refresh(todo)
-    return todo
+    return await apply_task_update(
+        db, task_id, user_id, data.model_dump(exclude_none=True)
+    )
 
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Soft delete a task.
@@ -152,27 +612,33 @@ def delete_task(
     """
     user_id = int(payload["sub"])
 
-    todo = db.query(Todo).filter(
-        Todo.id == task_id,
-        Todo.user_id == user_id,
-        Todo.is_deleted == False
-    ).first()
+    todo = await db.scalar(
+        select(Todo).where(
+            Todo.id == task_id,
+            Todo.user_id == user_id,
+            Todo.is_deleted == False
+        )
+    )
 
     if not todo:
         raise HTTPException(status_code=403, detail="Only owner can delete")
 
     todo.is_deleted = True
-    db.commit()
+    todo.deleted_at = func.now()
+    await bump_task_versions(db, [task_id])
+    await notify_task_changes(db, "deleted", [task_id])
+    await db.commit()
+    invalidate_task_permissions(task_id)
     return {"status": "deleted"}
 
 
 @router.post("/{task_id}/share")
-def share_task(
+async def share_task(
     task_id: int,
     user_email: str,
     permission: str,  
     payload: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Share a task with another user.
@@ -185,28 +651,19 @@ def share_task(
     if permission not in ("viewer", "editor"):
         raise HTTPException(status_code=400, detail="Invalid permission")
 
-    todo = (
-        db.query(Todo)
-        .filter(
-            Todo.id == task_id,
-            Todo.is_deleted == False
-        )
-        .first()
-    )
-    if not todo:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    if todo.user_id != user_id:
+    if await get_task_permission(task_id, user_id, db) != "owner":
         raise HTTPException(status_code=403, detail="Only owner can share")
 
-    user = db.query(User).filter(User.email == user_email).first()
+    user = await get_user_profile_by_email(db, user_email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    exists = db.query(TodoShare).filter(
-        TodoShare.todo_id == task_id,
-        TodoShare.user_id == user.id
-    ).first()
+    exists = await db.scalar(
+        select(TodoShare.id).where(
+            TodoShare.todo_id == task_id,
+            TodoShare.user_id == user.id
+        )
+    )
 
     if exists:
         raise HTTPException(status_code=400, detail="Already shared")
@@ -218,10 +675,137 @@ def share_task(
     )
 
     db.add(share)
-    db.commit()
+    await bump_user_versions(db, [user.id])
+    await notify_task_changes(db, "shared", [task_id])
+    await db.commit()
+    invalidate_task_permissions(task_id, user.id)
 
     return {
         "status": "shared",
         "email": user.email,
         "permission": permission
     }
+
+
+@router.post("/{task_id}/shares")
+async def share_task_bulk(
+    task_id: int,
+    data: TodoBulkShare,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Share a task with many users at once.
+
+    Only the owner can share. Existing shares get the new
+    permission. Outcomes are reported per email.
+    """
+    user_id = int(payload["sub"])
+
+    if await get_task_permission(task_id, user_id, db) != "owner":
+        raise HTTPException(status_code=403, detail="Only owner can share")
+
+    # last entry wins if an email is repeated
+    wanted = {item.email: item.permission for item in data.shares}
+
+    users = {
+        email: profile.id
+        for email, profile in (await get_user_profiles_by_email(db, wanted)).items()
+    }
+
+    results = {}
+    rows = []
+
+    for email, permission in wanted.items():
+        target_id = users.get(email)
+        if target_id is None:
+            results[email] = {"status": "error", "status_code": 404, "detail": "User not found"}
+        elif target_id == user_id:
+            results[email] = {"status": "error", "status_code": 400, "detail": "Cannot share with owner"}
+        else:
+            rows.append({"todo_id": task_id, "user_id": target_id, "permission": permission})
+
+    if rows:
+        stmt = pg_insert(TodoShare).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TodoShare.todo_id, TodoShare.user_id],
+            set_={"permission": stmt.excluded.permission}
+        ).returning(
+            TodoShare.user_id,
+            # xmax is 0 only for freshly inserted rows
+            literal_column("xmax = 0").label("inserted")
+        )
+        upserted = (await db.execute(stmt)).all()
+        await bump_user_versions(db, [target_id for target_id, _ in upserted])
+        await notify_task_changes(db, "shared", [task_id])
+        await db.commit()
+
+        emails = {uid: email for email, uid in users.items()}
+        for target_id, inserted in upserted:
+            invalidate_task_permissions(task_id, target_id)
+            email = emails[target_id]
+            results[email] = {
+                "status": "shared" if inserted else "updated",
+                "permission": wanted[email]
+            }
+
+    return {
+        "results": [{"email": email, **results[email]} for email in wanted]
+    }
+
+
+@router.delete("/{task_id}/shares")
+async def revoke_task_shares(
+    task_id: int,
+    data: TodoBulkRevoke,
+    payload: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Revoke a task's shares for many users at once.
+
+    Only the owner can revoke. Outcomes are reported per email.
+    """
+    user_id = int(payload["sub"])
+
+    if await get_task_permission(task_id, user_id, db) != "owner":
+        raise HTTPException(status_code=403, detail="Only owner can revoke")
+
+    emails = list(dict.fromkeys(data.emails))
+
+    # Core tables, not the ORM entities: RETURNING a column of the
+    # USING table (users.email) is a plain cursor result this way,
+    # instead of going through ORM bulk-DML result handling
+    shares, users = TodoShare.__table__, User.__table__
+    revoked = (
+        await db.execute(
+            delete(shares)
+            .where(
+                shares.c.todo_id == task_id,
+                shares.c.user_id == users.c.id,
+                users.c.email.in_(emails)
+            )
+            .returning(users.c.email, shares.c.user_id)
+        )
+    ).all()
+    if revoked:
+        revoked_ids = [target_id for _, target_id in revoked]
+        await bump_user_versions(db, revoked_ids)
+        await notify_task_changes(
+            db, "unshared", [task_id], revoked={task_id: revoked_ids}
+        )
+    await db.commit()
+
+    for _, target_id in revoked:
+        invalidate_task_permissions(task_id, target_id)
+
+    revoked_emails = {email for email, _ in revoked}
+
+    return {
+        "results": [
+            {"email": email, "status": "revoked"}
+            if email in revoked_emails
+            else {"email": email, "status": "not_shared"}
+            for email in emails
+        ]
+    }
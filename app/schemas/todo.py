@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Literal
 
 class TodoCreate(BaseModel):
@@ -10,6 +10,33 @@ class TodoUpdate(BaseModel):
     priority: Literal["High", "Medium", "Low"]
     completed: bool
 
+class TodoPatch(BaseModel):
+    title: str | None = None
+    priority: Literal["High", "Medium", "Low"] | None = None
+    completed: bool | None = None
+
+class TodoBatchUpdateItem(TodoPatch):
+    id: int
+
+class TodoBatchCreate(BaseModel):
+    tasks: list[TodoCreate] = Field(min_length=1, max_length=500)
+
+class TodoBatchUpdate(BaseModel):
+    tasks: list[TodoBatchUpdateItem] = Field(min_length=1, max_length=500)
+
+class TodoBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=500)
+
+class ShareItem(BaseModel):
+    email: str
+    permission: Literal["viewer", "editor"]
+
+class TodoBulkShare(BaseModel):
+    shares: list[ShareItem] = Field(min_length=1, max_length=500)
+
+class TodoBulkRevoke(BaseModel):
+    emails: list[str] = Field(min_length=1, max_length=500)
+
 class TodoResponse(BaseModel):
     id: int
     title: str
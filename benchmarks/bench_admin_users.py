@@ -0,0 +1,111 @@
+"""
+GET /admin/users over a large users table: keyset pages, role and
+email prefix filters and per-user counts, next to the OFFSET page and
+COUNT(*) they replace.
+
+Seeds `--rows` users (200k by default) straight in Postgres with
+generate_series, then drives the endpoint in-process through httpx's
+ASGI transport.
+
+    python -m benchmarks.bench_admin_users --rows 200000 --iterations 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func, select, text, update
+
+from app.core.pagination import encode_cursor
+from app.database import SessionLocal, async_engine, engine
+from app.models.user import User
+from main import app
+from benchmarks.bench_search import timed
+from benchmarks.common import bench_email, login, seed, summarize
+
+# one user in a hundred is an admin; the password is never checked
+SEED_USERS = text("""
+    INSERT INTO users (name, email, password, role)
+    SELECT
+        'bulk ' || g,
+        'bulk' || g || '@' || (ARRAY['example.com', 'example.org', 'mail.test'])[1 + g % 3],
+        'x',
+        CASE WHEN g % 100 = 0 THEN 'admin' ELSE 'user' END
+    FROM generate_series(:start, :stop) AS g
+""")
+
+# what a deep page cost before: OFFSET walks every row in front of it
+BASELINE = text("""
+    SELECT id, name, email, role FROM users
+    ORDER BY id OFFSET :offset LIMIT 50
+""")
+BASELINE_COUNT = text("SELECT count(*) FROM users")
+
+
+def seed_rows(rows: int):
+    seed(10, 1)
+    with SessionLocal() as db:
+        have = db.scalar(
+            select(func.count()).select_from(User).where(User.email.like("bulk%"))
+        )
+        if have < rows:
+            print(f"seeding {rows - have} users ...")
+            started = time.perf_counter()
+            db.execute(SEED_USERS, {"start": have + 1, "stop": rows})
+            db.commit()
+            print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM ANALYZE users"))
+
+        return db.scalar(select(func.max(User.id)))
+
+
+async def main(args):
+    last_id = seed_rows(args.rows)
+    with SessionLocal() as db:
+        db.execute(
+            update(User).where(User.email == bench_email(0)).values(role="admin")
+        )
+        db.commit()
+
+    # a page about 50 rows from the end, as a cursor and as an offset
+    deep_cursor = encode_cursor(last_id - 50)
+    with SessionLocal() as db:
+        deep_offset = db.scalar(
+            select(func.count()).select_from(User).where(User.id <= last_id - 50)
+        )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        admin = await login(client, bench_email(0))
+
+        async def get(params):
+            res = await client.get("/admin/users", params=params, headers=admin)
+            assert res.status_code == 200, res.text
+            return res
+
+        for label, params in [
+            ("first page", {}),
+            ("deep page", {"cursor": deep_cursor}),
+            ("role=admin", {"role": "admin"}),
+            ("email prefix", {"email_prefix": "bulk1234"}),
+            ("first page + counts", {"include_counts": "true"}),
+        ]:
+            total = (await get(params)).json()["estimated_total"]
+            print(f"{label}: ~{total} users")
+            summarize(label, *await timed(args.iterations, lambda: get(params)))
+
+    async with async_engine.connect() as conn:
+        async def baseline():
+            await conn.execute(BASELINE_COUNT)
+            (await conn.execute(BASELINE, {"offset": deep_offset})).all()
+
+        summarize("baseline OFFSET + COUNT", *await timed(args.iterations, baseline))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
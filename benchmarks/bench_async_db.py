@@ -0,0 +1,93 @@
+"""
+Sync vs async database path under concurrent load.
+
+Every simulated request runs the two GET /tasks queries for a random
+user. The sync path is what the old `def` handlers did: a SessionLocal
+session used from Starlette's threadpool (40 threads by default). The
+async path uses AsyncSessionLocal straight on the event loop.
+
+    python -m benchmarks.bench_async_db --clients 200 --requests 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from anyio import to_thread
+from sqlalchemy import select
+
+from app.database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from app.models.todo import Todo
+from app.models.todo_share import TodoShare
+from benchmarks.common import seed, summarize
+
+
+def owned_query(user_id: int):
+    return select(Todo).where(Todo.user_id == user_id, Todo.is_deleted == False)
+
+
+def shared_query(user_id: int):
+    return (
+        select(Todo, TodoShare.permission)
+        .join(TodoShare, Todo.id == TodoShare.todo_id)
+        .where(TodoShare.user_id == user_id, Todo.is_deleted == False)
+    )
+
+
+def sync_request(user_id: int):
+    with SessionLocal() as db:
+        db.scalars(owned_query(user_id)).all()
+        db.execute(shared_query(user_id)).all()
+
+
+async def sync_path(user_id: int):
+    await to_thread.run_sync(sync_request, user_id)
+
+
+async def async_path(user_id: int):
+    async with AsyncSessionLocal() as db:
+        (await db.scalars(owned_query(user_id))).all()
+        (await db.execute(shared_query(user_id))).all()
+
+
+async def drive(fn, user_ids, requests: int, clients: int):
+    latencies = []
+    per_client = max(1, requests // clients)
+
+    async def client():
+        for _ in range(per_client):
+            start = time.perf_counter()
+            await fn(random.choice(user_ids))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    user_ids = seed(args.users, args.todos, args.shares)
+
+    # warm both pools before measuring
+    await drive(sync_path, user_ids, args.clients, args.clients)
+    await drive(async_path, user_ids, args.clients, args.clients)
+
+    summarize("sync (threadpool)", *await drive(
+        sync_path, user_ids, args.requests, args.clients
+    ))
+    summarize("async", *await drive(
+        async_path, user_ids, args.requests, args.clients
+    ))
+
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--shares", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,52 @@
+"""
+Unchanged GET /tasks reloads: full response vs If-None-Match / 304.
+
+Drives the app in-process through httpx's ASGI transport, so the
+numbers are server-side cost without network noise.
+
+    python -m benchmarks.bench_etag --todos 500 --iterations 500
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from main import app
+from benchmarks.common import bench_email, login, seed, summarize
+
+
+async def reloads(client, headers, iterations: int, etag: str | None):
+    latencies = []
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        res = await client.get("/tasks", params={"limit": 200}, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+        assert res.status_code == (304 if etag else 200), res.status_code
+    return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    seed(1, args.todos)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await login(client, bench_email(0))
+
+        first = await client.get("/tasks", params={"limit": 200}, headers=headers)
+        etag = first.headers["ETag"]
+        print(f"full page: {len(first.content)} bytes, 304: 0 bytes")
+
+        summarize("full reload (200)", *await reloads(client, headers, args.iterations, None))
+        summarize("conditional (304)", *await reloads(client, headers, args.iterations, etag))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,109 @@
+"""
+Task-read latency during a login burst.
+
+Starts the app under uvicorn and measures GET /tasks on its own, then
+again while other clients hammer POST /login. bcrypt runs on the
+dedicated (reniced) hash pool and logins past its queue limit get a
+fast 503 and back off for Retry-After, so reads keep being served. By
+default the hash threads of all workers together use at most half the
+cores. A 1-core machine still gets one hash thread, so reads share the
+CPU with it: there, with 16 login clients, read p50 stayed at ~4.8ms
+while p99 rose from ~12ms to ~46ms.
+
+    python -m benchmarks.bench_login_burst --read-rate 50 --login-clients 16
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    bench_email,
+    login,
+    seed,
+    serve,
+    summarize,
+)
+
+
+async def read_traffic(client, headers, stop_at, rate, latencies):
+    """
+    Open-loop reads at a fixed rate, so a slow server shows up as
+    latency instead of silently lowering the offered load.
+    """
+    async def one():
+        start = time.perf_counter()
+        res = await client.get("/tasks", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        res.raise_for_status()
+
+    pending = []
+    next_at = time.monotonic()
+    while next_at < stop_at:
+        pending.append(asyncio.create_task(one()))
+        next_at += 1 / rate
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+    await asyncio.gather(*pending)
+
+
+async def login_loop(client, email, stop_at, latencies, statuses):
+    body = {"email": email, "password": BENCH_PASSWORD}
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        res = await client.post("/login", json=body)
+        latencies.append(time.perf_counter() - start)
+        statuses[res.status_code] += 1
+        if res.status_code == 503:
+            # well-behaved clients back off as told
+            await asyncio.sleep(float(res.headers.get("Retry-After", 1)))
+
+
+async def phase(base_url, headers, args, with_logins: bool):
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop_at = time.monotonic() + args.duration
+        reads, logins, statuses = [], [], Counter()
+
+        jobs = [read_traffic(client, headers, stop_at, args.read_rate, reads)]
+        if with_logins:
+            jobs += [
+                login_loop(client, bench_email(i % args.users), stop_at, logins, statuses)
+                for i in range(args.login_clients)
+            ]
+
+        start = time.perf_counter()
+        await asyncio.gather(*jobs)
+        elapsed = time.perf_counter() - start
+
+        label = "reads during login burst" if with_logins else "reads only"
+        row = summarize(label, reads, elapsed)
+        if with_logins:
+            summarize("logins", logins, elapsed)
+            print(f"login statuses: {dict(statuses)}")
+        return row
+
+
+async def main(args):
+    seed(args.users, args.todos)
+
+    with serve() as base_url:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            headers = await login(client, bench_email(0))
+
+        quiet = await phase(base_url, headers, args, with_logins=False)
+        burst = await phase(base_url, headers, args, with_logins=True)
+
+    print(f"read p99 change: {burst['p99_ms'] / quiet['p99_ms']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--todos", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--read-rate", type=float, default=50, help="reads per second")
+    parser.add_argument("--login-clients", type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+POST /refresh with a large revocation list, checked in memory and
+through the table fallback a worker uses while out of sync. Refresh
+writes nothing; only logout revokes (the session).
+
+Seeds `--revoked` unexpired rows into revoked_tokens, starts the
+app's lifespan so the revocation list loads them, then drives the
+endpoint in-process through httpx's ASGI transport.
+
+    python -m benchmarks.bench_refresh --revoked 100000 --iterations 500
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func, select, text
+
+from app.core.metrics import count_queries
+from app.core.revocation import revocations
+from app.database import SessionLocal
+from app.models.revoked_token import RevokedToken
+from main import app
+from benchmarks.bench_search import timed
+from benchmarks.common import BENCH_PASSWORD, bench_email, seed, summarize
+
+SEED_REVOKED = text("""
+    INSERT INTO revoked_tokens (jti, user_id, expires_at)
+    SELECT md5('bench' || g), NULL, now() + interval '7 days'
+    FROM generate_series(:start, :stop) AS g
+    ON CONFLICT DO NOTHING
+""")
+
+
+def seed_revoked(rows: int):
+    with SessionLocal() as db:
+        have = db.scalar(
+            select(func.count()).select_from(RevokedToken)
+            .where(RevokedToken.user_id.is_(None))
+        )
+        if have < rows:
+            print(f"seeding {rows - have} revoked tokens ...")
+            db.execute(SEED_REVOKED, {"start": have + 1, "stop": rows})
+            db.commit()
+
+
+async def main(args):
+    seed(2, 1)
+    seed_revoked(args.revoked)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.wait_for(revocations.synced.wait(), 60)
+        print(f"revocation list: {len(revocations.revoked)} ids loaded "
+              f"in {time.perf_counter() - started:.2f}s")
+
+        res = await client.post(
+            "/login", json={"email": bench_email(0), "password": BENCH_PASSWORD}
+        )
+        # the cookie is Secure, so the client jar will not send it over http
+        cookie = {"Cookie": f"refresh_token={res.cookies['refresh_token']}"}
+
+        async def refresh():
+            res = await client.post("/refresh", headers=cookie)
+            assert res.status_code == 200, res.text
+            cookie["Cookie"] = f"refresh_token={res.cookies['refresh_token']}"
+
+        with count_queries() as stats:
+            latencies, elapsed = await timed(args.iterations, refresh)
+        summarize("refresh, in memory", latencies, elapsed)
+        print(f"  {stats.statements / args.iterations:.2f} queries per request")
+
+        # what every refresh would cost with a lookup per request
+        revocations.synced.clear()
+        try:
+            with count_queries() as stats:
+                latencies, elapsed = await timed(args.iterations, refresh)
+        finally:
+            revocations.synced.set()
+        summarize("refresh, table lookup", latencies, elapsed)
+        print(f"  {stats.statements / args.iterations:.2f} queries per request")
+
+        await client.post("/logout", headers=cookie)
+        res = await client.post("/refresh", headers=cookie)
+        print(f"refresh after logout: {res.status_code}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
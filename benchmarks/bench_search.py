@@ -0,0 +1,152 @@
+"""
+Title search (q=) on GET /admin/tasks and GET /tasks over a large
+todos table, next to the unindexed ILIKE scan it replaces.
+
+Seeds `--rows` todos (one million by default) straight in Postgres
+with generate_series, spread over `--users` benchmark users, then
+drives the endpoints in-process through httpx's ASGI transport.
+
+    python -m benchmarks.bench_search --rows 1000000 --iterations 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import func, select, text, update
+
+from app.database import SessionLocal, async_engine, engine
+from app.models.todo import Todo
+from app.models.user import User
+from main import app
+from benchmarks.common import bench_email, login, seed, summarize
+
+VERBS = ["review", "write", "fix", "plan", "call", "buy", "update", "send", "book", "clean"]
+NOUNS = [
+    "report", "invoice", "budget", "roadmap", "slides", "garden", "kitchen", "groceries",
+    "dentist", "flight", "newsletter", "contract", "backlog", "release", "database",
+    "meeting", "proposal", "survey", "homework", "laptop", "car", "insurance", "taxes",
+    "birthday", "wedding", "recipe", "playlist", "website", "podcast", "workshop",
+]
+
+# titles look like "review budget for project 1234"; the project
+# number makes rare terms, the verb and noun common ones
+SEED_TODOS = text("""
+    INSERT INTO todos (title, priority, completed, user_id, is_deleted)
+    SELECT
+        (CAST(:verbs AS text[]))[1 + g % 10] || ' '
+            || (CAST(:nouns AS text[]))[1 + (g / 10) % 30]
+            || ' for project ' || (g::bigint * 7919) % 5000,
+        (ARRAY['High', 'Medium', 'Low'])[1 + g % 3],
+        g % 4 = 0,
+        (CAST(:user_ids AS int[]))[1 + g % cardinality(CAST(:user_ids AS int[]))],
+        false
+    FROM generate_series(1, :count) AS g
+""")
+
+# what title filtering cost before: ILIKE over every live title
+BASELINE = text("""
+    SELECT id, title, priority, completed FROM todos
+    WHERE NOT is_deleted AND title ILIKE :pattern
+    ORDER BY id LIMIT 50
+""")
+BASELINE_COUNT = text(
+    "SELECT count(*) FROM todos WHERE NOT is_deleted AND title ILIKE :pattern"
+)
+
+
+def seed_rows(rows: int, users: int):
+    """
+    Top the bench users' todos up to `rows` and return the user ids.
+    """
+    user_ids = seed(users, 1)
+
+    with SessionLocal() as db:
+        have = db.scalar(
+            select(func.count()).select_from(Todo).where(Todo.user_id.in_(user_ids))
+        )
+        if have < rows:
+            print(f"seeding {rows - have} todos ...")
+            started = time.perf_counter()
+            db.execute(SEED_TODOS, {
+                "verbs": VERBS,
+                "nouns": NOUNS,
+                "user_ids": user_ids,
+                "count": rows - have,
+            })
+            db.commit()
+            print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+            # statistics and a merged GIN pending list, as autovacuum
+            # would leave them after a bulk load
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM ANALYZE todos"))
+
+        trgm = db.scalar(text(
+            "SELECT count(*) FROM pg_indexes WHERE indexname = 'ix_todos_title_trgm'"
+        ))
+        print(f"trigram index: {'yes' if trgm else 'no (pg_trgm unavailable)'}")
+
+    return user_ids
+
+
+async def timed(iterations: int, call):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    seed_rows(args.rows, args.users)
+    with SessionLocal() as db:
+        db.execute(
+            update(User).where(User.email == bench_email(0)).values(role="admin")
+        )
+        db.commit()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        admin = await login(client, bench_email(0))
+        user = await login(client, bench_email(1))
+
+        async def get(path, headers, q):
+            res = await client.get(path, params={"q": q, "limit": 50}, headers=headers)
+            assert res.status_code == 200, res.text
+            return res
+
+        for label, q in [
+            ("rare word", "project 4242"),
+            ("common word", "budget"),
+            ("phrase", '"review budget"'),
+            ("substring", "ebsi"),
+        ]:
+            total = (await get("/admin/tasks", admin, q)).headers["X-Total-Count"]
+            print(f"admin q={q!r}: {total} matches")
+            summarize(
+                f"admin {label}",
+                *await timed(args.iterations, lambda: get("/admin/tasks", admin, q))
+            )
+        summarize(
+            "user common word",
+            *await timed(args.iterations, lambda: get("/tasks", user, "budget"))
+        )
+
+    async with async_engine.connect() as conn:
+        async def baseline():
+            params = {"pattern": "%budget%"}
+            await conn.execute(BASELINE_COUNT, params)
+            (await conn.execute(BASELINE, params)).all()
+
+        summarize("baseline ILIKE scan", *await timed(max(1, args.iterations // 5), baseline))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+List response building: ORM entities + jsonable_encoder + json vs
+column tuples + ORJSONResponse, at 1k / 10k / 100k rows.
+
+Rows come from an in-memory SQLite table holding the todos columns a
+list response serializes, so the numbers cover hydration and
+serialization without network or Postgres noise. Peak memory is the
+tracemalloc high-water mark for one build.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import Boolean, Column, Integer, String, create_engine, insert, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.responses import rows_as_dicts
+
+BenchBase = declarative_base()
+
+
+class Todo(BenchBase):
+    """
+    The todos columns list responses use. The app's Todo model also
+    has Postgres-only columns (the tsvector) that SQLite cannot create.
+    """
+    __tablename__ = "todos"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    priority = Column(String, nullable=False)
+    completed = Column(Boolean, default=False)
+    user_id = Column(Integer)
+    is_deleted = Column(Boolean, default=False)
+
+
+def build_db(rows: int):
+    engine = create_engine("sqlite://")
+    BenchBase.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Todo), [
+            {
+                "title": f"Benchmark task {i}",
+                "priority": ("High", "Medium", "Low")[i % 3],
+                "completed": i % 2 == 0,
+                "user_id": 1,
+                "is_deleted": False,
+            }
+            for i in range(rows)
+        ])
+    return engine
+
+
+def orm_encoder(engine) -> bytes:
+    with Session(engine) as db:
+        tasks = db.scalars(select(Todo).order_by(Todo.id)).all()
+        rows = [
+            {
+                "id": task.id,
+                "title": task.title,
+                "priority": task.priority,
+                "completed": task.completed,
+            }
+            for task in tasks
+        ]
+        return JSONResponse(jsonable_encoder(rows)).body
+
+
+def column_tuples(engine) -> bytes:
+    with Session(engine) as db:
+        rows = rows_as_dicts(db.execute(
+            select(Todo.id, Todo.title, Todo.priority, Todo.completed)
+            .order_by(Todo.id)
+        ))
+        return ORJSONResponse(rows).body
+
+
+def measure(fn, engine, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        body = fn(engine)
+        best = min(best, time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    fn(engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(body)
+
+
+def main(args):
+    for size in args.sizes:
+        engine = build_db(size)
+        print(f"{size} rows")
+        for name, fn in (("orm + jsonable_encoder", orm_encoder),
+                         ("column tuples + orjson", column_tuples)):
+            best, peak, length = measure(fn, engine, args.repeat)
+            print(
+                f"  {name:<26} {best * 1000:9.1f} ms"
+                f"  peak {peak / 2**20:8.1f} MiB  body {length / 2**20:6.1f} MiB"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
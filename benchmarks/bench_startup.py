@@ -0,0 +1,103 @@
+"""
+Time to first successful request for a fresh uvicorn worker, with
+the startup warm-up on and off.
+
+Each round starts the app in a new process and polls an endpoint
+until it answers 200, then sends a few more requests. Reports, per
+endpoint, the time from process start to that first 200, the first
+request's own latency and the latency of the requests after it.
+
+    python -m benchmarks.bench_startup --rounds 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import update
+
+from app.core.security import create_access_token
+from app.database import SessionLocal
+from app.models.user import User
+from benchmarks.common import free_port, seed
+
+# requests after the first one, for the warm latency
+FOLLOW_UPS = 5
+
+
+def first_request(args, env: dict, path: str, headers: dict):
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        env={**os.environ, **env},
+    )
+    url = f"http://127.0.0.1:{port}{path}"
+
+    try:
+        with httpx.Client(timeout=30) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    res = client.get(url, headers=headers)
+                    if res.status_code == 200:
+                        first = time.perf_counter() - t0
+                        break
+                except httpx.TransportError:
+                    pass
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("server did not start")
+                time.sleep(args.poll)
+
+            ready = time.perf_counter() - started
+            later = []
+            for _ in range(FOLLOW_UPS):
+                t0 = time.perf_counter()
+                client.get(url, headers=headers).raise_for_status()
+                later.append(time.perf_counter() - t0)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return ready, first, statistics.median(later)
+
+
+def main(args):
+    ids = seed(3, 50, 5)
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == ids[0]).values(role="admin"))
+        db.commit()
+
+    user = {"Authorization": f"Bearer {create_access_token(ids[1], 'user')}"}
+    admin = {"Authorization": f"Bearer {create_access_token(ids[0], 'admin')}"}
+    targets = [
+        ("GET /tasks", "/tasks", user),
+        ("GET /admin/users", "/admin/users", admin),
+    ]
+
+    print(f"{'warm-up':<8} {'endpoint':<18} {'to first 200':>13} {'first':>10} {'after':>10}")
+    for warmup in ("true", "false"):
+        for label, path, headers in targets:
+            runs = [
+                first_request(args, {"STARTUP_WARMUP": warmup}, path, headers)
+                for _ in range(args.rounds)
+            ]
+            ready, first, later = (statistics.median(column) for column in zip(*runs))
+            print(
+                f"{'on' if warmup == 'true' else 'off':<8} {label:<18} "
+                f"{ready * 1000:>10.0f} ms {first * 1000:>7.1f} ms {later * 1000:>7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--poll", type=float, default=0.02)
+    main(parser.parse_args())
@@ -0,0 +1,78 @@
+"""
+Static route throughput: in-memory precompressed assets vs disk reads.
+
+The baseline app serves pages with read_text() per request and /static
+through StaticFiles, which is how main.py used to work. Both apps are
+driven in-process through httpx's ASGI transport with gzip accepted.
+
+    python -m benchmarks.bench_static --iterations 2000
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse
+from fastapi.staticfiles import StaticFiles
+
+from app.routes.pages import STATIC_DIR, assets, router as pages_router
+from benchmarks.common import summarize
+
+
+def baseline_app():
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+    @app.get("/", response_class=HTMLResponse)
+    def dashboard():
+        return (STATIC_DIR / "index.html").read_text(encoding="utf-8")
+
+    return app
+
+
+def current_app():
+    app = FastAPI()
+    app.include_router(pages_router)
+    return app
+
+
+async def hammer(app, path: str, iterations: int, headers: dict):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            res = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - t0)
+            assert res.status_code in (200, 304), res.status_code
+        return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    gzip_only = {"Accept-Encoding": "gzip"}
+    script = assets.assets["script.js"]
+    cases = [
+        ("/", "/", gzip_only),
+        ("/static/script.js", f"/static/{script.hashed_name}", gzip_only),
+        (
+            "/static/script.js",
+            f"/static/{script.hashed_name}",
+            {**gzip_only, "If-None-Match": script.etag_for("gzip")},
+        ),
+    ]
+
+    baseline, current = baseline_app(), current_app()
+
+    for old_path, new_path, headers in cases:
+        label = old_path + (" (304)" if "If-None-Match" in headers else "")
+        print(label)
+        summarize("  disk / StaticFiles", *await hammer(baseline, old_path, args.iterations, headers))
+        summarize("  in-memory", *await hammer(current, new_path, args.iterations, headers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
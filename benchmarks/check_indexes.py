@@ -0,0 +1,207 @@
+"""
+EXPLAIN check: every hot query issued by the routes uses an index.
+
+Seeds benchmark data, drives the task and admin endpoints in-process
+and records each SELECT/UPDATE/DELETE the app sends to Postgres. Each
+recorded statement is then EXPLAINed (plan only, nothing executes)
+with seq scans, hash and merge joins disabled, so a full table or
+index walk left in the plan means no usable index exists rather than
+a planner preference on a small table. Exits non-zero if any statement
+walks todos, todo_shares, users or audit_logs end to end, outside the
+unfiltered admin listings.
+
+    python -m benchmarks.check_indexes
+"""
+import argparse
+import asyncio
+import re
+import sys
+
+import httpx
+import orjson
+from sqlalchemy import event, text, update
+
+from app.database import SessionLocal, async_engine, engine
+from app.models.user import User
+from benchmarks.common import bench_email, login, seed
+from main import app
+
+# With these off the planner must reach rows through index lookups
+# wherever an index can serve the condition, so whatever still walks
+# a whole table or index has no index to use.
+PLANNER_SETTINGS = ("enable_seqscan", "enable_hashjoin", "enable_mergejoin")
+
+WATCHED_TABLES = {"todos", "todo_shares", "users", "audit_logs"}
+
+# unfiltered admin listings page through whole tables in index order;
+# a full walk is expected there
+FULL_SCAN_EXPECTED = {"GET /admin/users", "GET /admin/tasks", "GET /admin/tasks shared"}
+
+
+INDEXES = text("""
+    SELECT ic.relname, t.relname, pg_get_indexdef(i.indexrelid, 1, true)
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    WHERE t.relname = ANY(:tables)
+""").bindparams(tables=sorted(WATCHED_TABLES))
+
+
+def scanned_table(node, indexes: dict):
+    # bitmap index scans name the index but not the table
+    if "Relation Name" in node:
+        return node["Relation Name"]
+    if "Index Name" in node:
+        return indexes[node["Index Name"]][0]
+    return None
+
+
+def full_scan(node, indexes: dict):
+    """
+    A sequential scan, or an index walked end to end because the
+    condition does not touch its leading column (the planner's
+    fallback once seq scans are disabled).
+    """
+    if node["Node Type"] == "Seq Scan":
+        return True
+    if "Index Name" not in node:
+        return False
+
+    cond = node.get("Index Cond")
+    if cond is None:
+        return True
+
+    column = indexes[node["Index Name"]][1]
+    if not column.isidentifier():
+        # expression index; a condition on it is a lookup
+        return False
+    return not re.search(rf"(^|\()\s*\(?{column}\)?(::\w+)?\s*(=|<|>|@@|~~\*|IS\b)", cond)
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+async def drive(client, captured, ids):
+    """
+    Hit the hot endpoints, labelling the statements each one sends.
+    """
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == ids[2]).values(role="admin"))
+        db.commit()
+
+    owner = await login(client, bench_email(0))
+    sharee = await login(client, bench_email(1))
+    admin = await login(client, bench_email(2))
+
+    tasks = (await client.get("/tasks", headers=owner)).json()["items"]
+    own_id = tasks[0]["id"]
+    shared = (await client.get("/tasks", params={"permission": "editor"}, headers=sharee)).json()["items"]
+    cursor = (await client.get("/tasks", params={"limit": 5}, headers=owner)).json()["next_cursor"]
+    users_cursor = (await client.get("/admin/users", params={"role": "user", "limit": 5}, headers=admin)).json()["next_cursor"]
+
+    requests = [
+        ("GET /tasks", "GET", "/tasks", owner, {}),
+        ("GET /tasks page 2", "GET", "/tasks", owner, {"params": {"limit": 5, "cursor": cursor}}),
+        ("GET /tasks filtered", "GET", "/tasks", owner, {"params": {"completed": "false", "priority": "High"}}),
+        ("GET /tasks shared", "GET", "/tasks", sharee, {"params": {"permission": "viewer"}}),
+        ("GET /tasks q", "GET", "/tasks", owner, {"params": {"q": "77"}}),
+        ("GET /me", "GET", "/me", owner, {}),
+        ("PATCH /tasks/{id}", "PATCH", f"/tasks/{own_id}", owner, {"json": {"completed": True}}),
+        ("PATCH /tasks/batch", "PATCH", "/tasks/batch", owner, {"json": {"tasks": [{"id": own_id, "priority": "Low"}]}}),
+        ("POST /tasks/{id}/shares", "POST", f"/tasks/{own_id}/shares", owner,
+         {"json": {"shares": [{"email": bench_email(3), "permission": "viewer"}]}}),
+        ("DELETE /tasks/{id}/shares", "DELETE", f"/tasks/{own_id}/shares", owner, {"json": {"emails": [bench_email(3)]}}),
+        ("GET /admin/users", "GET", "/admin/users", admin, {}),
+        ("GET /admin/users page 2", "GET", "/admin/users", admin, {"params": {"role": "user", "limit": 5, "cursor": users_cursor}}),
+        ("GET /admin/users role", "GET", "/admin/users", admin, {"params": {"role": "admin"}}),
+        ("GET /admin/users prefix", "GET", "/admin/users", admin, {"params": {"email_prefix": "BENCH12"}}),
+        ("GET /admin/users counts", "GET", "/admin/users", admin, {"params": {"role": "user", "limit": 5, "cursor": users_cursor, "include_counts": "true"}}),
+        ("GET /admin/tasks", "GET", "/admin/tasks", admin, {}),
+        ("GET /admin/tasks search", "GET", "/admin/tasks", admin, {"params": {"search": bench_email(1).upper()}}),
+        ("GET /admin/tasks shared", "GET", "/admin/tasks", admin, {"params": {"shared": "true", "completed": "false"}}),
+        ("GET /admin/tasks q", "GET", "/admin/tasks", admin, {"params": {"q": "77"}}),
+        ("GET /admin/audit", "GET", "/admin/audit", admin, {"params": {"actor_id": ids[2]}}),
+    ]
+    if shared:
+        requests.append(
+            ("PATCH shared task", "PATCH", f"/tasks/{shared[0]['id']}", sharee, {"json": {"title": "edited"}})
+        )
+    requests.append(("DELETE /tasks/{id}", "DELETE", f"/tasks/{own_id}", owner, {}))
+
+    for label, method, url, headers, kwargs in requests:
+        captured["label"] = label
+        res = await client.request(method, url, headers=headers, **kwargs)
+        assert res.status_code < 400, (label, res.status_code, res.text)
+
+
+async def main(args):
+    ids = seed(args.users, args.todos, args.shares)
+    # what autovacuum would do after the bulk seed: fresh statistics,
+    # and the GIN pending list merged so the planner costs it fairly
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE todos, todo_shares, users"))
+
+    captured = {"label": None, "statements": {}}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        label = captured["label"]
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if label and verb in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            if "pg_notify" not in statement:
+                params = parameters[0] if executemany else parameters
+                captured["statements"].setdefault((label, statement), params)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        await drive(client, captured, ids)
+    captured["label"] = None
+
+    failures = 0
+    async with async_engine.connect() as conn:
+        indexes = {
+            name: (table, leading)
+            for name, table, leading in (await conn.execute(INDEXES)).all()
+        }
+        for setting in PLANNER_SETTINGS:
+            await conn.exec_driver_sql(f"SET {setting} = off")
+        for (label, statement), params in captured["statements"].items():
+            result = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, params
+            )
+            plan = result.scalar()
+            if isinstance(plan, (str, bytes)):
+                plan = orjson.loads(plan)
+
+            nodes = list(plan_nodes(plan[0]["Plan"]))
+            seq = sorted({
+                scanned_table(n, indexes) for n in nodes
+                if scanned_table(n, indexes) in WATCHED_TABLES
+                and full_scan(n, indexes)
+            })
+            used = sorted({n["Index Name"] for n in nodes if "Index Name" in n})
+
+            if seq and label in FULL_SCAN_EXPECTED:
+                status = "full"
+            else:
+                status = "FAIL" if seq else "ok"
+                failures += bool(seq)
+            summary = " ".join(statement.split())[:70]
+            print(f"{status:4}  {label:<26} {summary}")
+            print(f"      indexes: {', '.join(used) or '-'}"
+                  + (f"  full scan: {', '.join(seq)}" if seq else ""))
+        await conn.rollback()
+
+    print(f"\n{len(captured['statements'])} statements, {failures} without an index")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--shares", type=int, default=10)
+    sys.exit(1 if asyncio.run(main(parser.parse_args())) else 0)
@@ -0,0 +1,110 @@
+"""
+Query budget check: no endpoint runs more SQL statements than it
+should, however much data it returns.
+
+Seeds users with many tasks and shares, then drives each endpoint
+in-process under assert_max_queries() with its budget. An N+1
+query shows up as a count that grows with the page size, so the
+budgets are fixed numbers. Exits non-zero on any overrun.
+
+    python -m benchmarks.check_queries
+"""
+import argparse
+import asyncio
+import sys
+
+import httpx
+from sqlalchemy import update
+
+from app.core.health import db_pinger
+from app.core.metrics import assert_max_queries
+from app.database import SessionLocal
+from app.models.user import User
+from benchmarks.common import BENCH_PASSWORD, bench_email, login, seed
+from main import app
+
+
+async def drive(client):
+    """
+    (label, budget, request) for the endpoints under check, in an
+    order where every request finds what it needs.
+    """
+    owner = await login(client, bench_email(0))
+    sharee = await login(client, bench_email(1))
+    admin = await login(client, bench_email(2))
+
+    # fresh tasks for the writes, so the check can run again
+    res = await client.post("/tasks/batch", headers=owner, json={
+        "tasks": [{"title": f"budget {n}", "priority": "Low"} for n in range(51)]
+    })
+    own_id, *batch_ids = [r["task"]["id"] for r in res.json()["results"]]
+    shared_id = batch_ids.pop()
+    await client.post(f"/tasks/{shared_id}/shares", headers=owner, json={
+        "shares": [{"email": bench_email(1), "permission": "editor"}]
+    })
+
+    return [
+        ("POST /login", 1, ("POST", "/login", None,
+            {"json": {"email": bench_email(3), "password": BENCH_PASSWORD}})),
+        ("GET /me", 1, ("GET", "/me", owner, {})),
+        ("GET /health/ready", 0, ("GET", "/health/ready", None, {})),
+        ("GET /tasks", 2, ("GET", "/tasks", owner, {"params": {"limit": 200}})),
+        ("GET /tasks shared", 2, ("GET", "/tasks", sharee, {"params": {"limit": 200}})),
+        ("GET /tasks q", 3, ("GET", "/tasks", owner, {"params": {"q": "task"}})),
+        ("POST /tasks", 4, ("POST", "/tasks", owner, {"json": {"title": "budget", "priority": "Low"}})),
+        ("POST /tasks/batch", 4, ("POST", "/tasks/batch", owner,
+            {"json": {"tasks": [{"title": f"budget {n}", "priority": "Low"} for n in range(50)]}})),
+        ("PUT /tasks/{id}", 4, ("PUT", f"/tasks/{own_id}", owner,
+            {"json": {"title": "budget", "priority": "High", "completed": False}})),
+        ("PATCH /tasks/{id}", 4, ("PATCH", f"/tasks/{own_id}", owner, {"json": {"completed": True}})),
+        ("PATCH shared task", 4, ("PATCH", f"/tasks/{shared_id}", sharee, {"json": {"title": "edited"}})),
+        ("PATCH /tasks/batch", 5, ("PATCH", "/tasks/batch", owner,
+            {"json": {"tasks": [{"id": i, "priority": "Medium"} for i in batch_ids]}})),
+        ("POST /tasks/{id}/shares", 6, ("POST", f"/tasks/{own_id}/shares", owner,
+            {"json": {"shares": [{"email": bench_email(n), "permission": "viewer"} for n in range(3, 13)]}})),
+        ("DELETE /tasks/{id}/shares", 4, ("DELETE", f"/tasks/{own_id}/shares", owner,
+            {"json": {"emails": [bench_email(n) for n in range(3, 13)]}})),
+        ("DELETE /tasks/batch", 5, ("DELETE", "/tasks/batch", owner, {"json": {"ids": batch_ids}})),
+        ("DELETE /tasks/{id}", 5, ("DELETE", f"/tasks/{own_id}", owner, {})),
+        ("GET /admin/users", 3, ("GET", "/admin/users", admin, {})),
+        ("GET /admin/users counts", 4, ("GET", "/admin/users", admin, {"params": {"include_counts": "true"}})),
+        ("GET /admin/tasks", 2, ("GET", "/admin/tasks", admin, {"params": {"limit": 200}})),
+        ("GET /admin/audit", 1, ("GET", "/admin/audit", admin, {})),
+    ]
+
+
+async def main(args):
+    ids = seed(args.users, args.todos, args.shares)
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.id == ids[2]).values(role="admin"))
+        db.commit()
+
+    failures = 0
+    transport = httpx.ASGITransport(app=app)
+    # with the app's background services, as under uvicorn
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        while not db_pinger.up:
+            await asyncio.sleep(0.05)
+        for label, budget, (method, url, headers, kwargs) in await drive(client):
+            try:
+                with assert_max_queries(budget, label) as stats:
+                    res = await client.request(method, url, headers=headers, **kwargs)
+                ok = True
+            except AssertionError:
+                ok = False
+            assert res.status_code < 400, (label, res.status_code, res.text)
+
+            failures += not ok
+            print(f"{'ok' if ok else 'OVER':<5} {label:<28} {stats.statements:>3} / {budget}")
+
+    print(f"\n{failures} endpoints over budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--shares", type=int, default=20)
+    sys.exit(asyncio.run(main(parser.parse_args())))
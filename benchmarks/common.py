@@ -0,0 +1,176 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run from the repository root against the database in
+DATABASE_URL (SECRET_KEY must be set as well), for example:
+
+    python -m benchmarks.bench_async_db --users 50 --todos 200
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import httpx
+from sqlalchemy import insert, select
+
+from app.database import SessionLocal
+from app.controllers.auth_controller import hash_password
+from app.models.user import User
+from app.models.todo import Todo
+from app.models.todo_share import TodoShare
+
+BENCH_PASSWORD = "bench-password"
+
+
+def bench_email(i: int):
+    return f"bench{i}@bench.example.com"
+
+
+def seed(users: int, todos_per_user: int, shares_per_user: int = 0):
+    """
+    Make sure `users` benchmark users exist, each owning
+    `todos_per_user` todos and sharing `shares_per_user` of them
+    with the next user. Returns the benchmark user ids.
+    """
+    emails = [bench_email(i) for i in range(users)]
+
+    with SessionLocal() as db:
+        existing = dict(
+            db.execute(
+                select(User.email, User.id).where(User.email.in_(emails))
+            ).all()
+        )
+        missing = [e for e in emails if e not in existing]
+
+        if missing:
+            hashed = hash_password(BENCH_PASSWORD)
+            db.execute(insert(User), [
+                {"name": e.split("@")[0], "email": e, "password": hashed}
+                for e in missing
+            ])
+            existing = dict(
+                db.execute(
+                    select(User.email, User.id).where(User.email.in_(emails))
+                ).all()
+            )
+
+            user_ids = [existing[e] for e in emails]
+            new_ids = [existing[e] for e in missing]
+
+            db.execute(insert(Todo), [
+                {
+                    "title": f"bench task {n}",
+                    "priority": ("High", "Medium", "Low")[n % 3],
+                    "completed": n % 4 == 0,
+                    "user_id": uid,
+                    "is_deleted": False,
+                }
+                for uid in new_ids
+                for n in range(todos_per_user)
+            ])
+
+            if shares_per_user and users > 1:
+                todo_rows = db.execute(
+                    select(Todo.id, Todo.user_id).where(Todo.user_id.in_(new_ids))
+                ).all()
+                by_owner = {}
+                for todo_id, owner_id in todo_rows:
+                    by_owner.setdefault(owner_id, []).append(todo_id)
+
+                shares = []
+                for idx, uid in enumerate(user_ids):
+                    target = user_ids[(idx + 1) % users]
+                    for todo_id in by_owner.get(uid, [])[:shares_per_user]:
+                        shares.append({
+                            "todo_id": todo_id,
+                            "user_id": target,
+                            "permission": "editor" if todo_id % 2 else "viewer",
+                        })
+                if shares:
+                    db.execute(insert(TodoShare), shares)
+
+            db.commit()
+
+        return [existing[e] for e in emails]
+
+
+def percentile(values, pct: float):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(name: str, latencies, elapsed: float):
+    """
+    Print one result row and return it as a dict (latencies in ms).
+    """
+    row = {
+        "name": name,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+    print(
+        f"{name:<28} {row['requests']:>7} req  {row['rps']:>9.1f} req/s  "
+        f"p50 {row['p50_ms']:>8.2f} ms  p99 {row['p99_ms']:>8.2f} ms"
+    )
+    return row
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workers: int = 1, env: dict | None = None):
+    """
+    Run the app under uvicorn in a subprocess and yield its base URL.
+    """
+    port = free_port()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        # tells each worker how many siblings share the machine
+        env={**os.environ, "WEB_CONCURRENCY": str(workers), **(env or {})},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("server did not start")
+            time.sleep(0.2)
+
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str = BENCH_PASSWORD):
+    """
+    Log in and return Authorization headers for `email`.
+    """
+    res = await client.post("/login", json={"email": email, "password": password})
+    res.raise_for_status()
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
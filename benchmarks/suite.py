@@ -0,0 +1,399 @@
+"""
+Regression benchmark suite for the API.
+
+Seeds benchmark users, todos and shares, then runs every scenario
+(auth, task CRUD, sharing, admin reads) in order, either in-process
+through httpx's ASGI transport or against uvicorn workers driven by
+several load generator processes. Reports throughput, latency
+percentiles and, in-process, SQL statements per request, then
+compares them with a stored baseline and exits non-zero when a
+scenario got slower, issues more queries or returned errors.
+
+    python -m benchmarks.suite                      # in-process
+    python -m benchmarks.suite --mode load --workers 2 --procs 4
+    python -m benchmarks.suite --save-baseline      # record new numbers
+
+Baselines are per mode, in benchmarks/baselines/. Latency and
+throughput depend on the machine, so record them where the suite
+runs; query counts do not.
+"""
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import orjson
+from sqlalchemy import update
+
+from app.core.metrics import count_queries
+from app.core.revocation import revocations
+from app.database import SessionLocal
+from app.models.user import User
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    bench_email,
+    login,
+    percentile,
+    seed,
+    serve,
+)
+from main import app
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# bcrypt-bound scenarios run this fraction of --requests
+AUTH_SHARE = 0.1
+
+# queries per request may drift a little as TTL caches (permissions,
+# tokens) hit or miss; anything beyond this is a real extra query
+QUERY_SLACK = 0.25
+
+
+def refresh_cookie(res: httpx.Response):
+    # the cookie is Secure, so the client jar will not send it over http
+    return {"Cookie": f"refresh_token={res.cookies['refresh_token']}"}
+
+
+class Session:
+    """
+    What one load generator knows: its user, the admin, and the
+    tasks it created, which later scenarios update and delete.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, index: int):
+        self.client = client
+        self.email = bench_email(index)
+        self.sharee = bench_email(index + 1)
+        self.tag = f"{uuid.uuid4().hex[:8]}-{index}"
+        self.counter = itertools.count()
+        self.created: list[int] = []
+        self.cursor = itertools.count()
+
+    async def start(self):
+        res = await self.client.post(
+            "/login", json={"email": self.email, "password": BENCH_PASSWORD}
+        )
+        res.raise_for_status()
+        self.user = {"Authorization": f"Bearer {res.json()['access_token']}"}
+        self.refresh = refresh_cookie(res)
+        self.admin = await login(self.client, bench_email(0))
+
+    def next_task(self):
+        return self.created[next(self.cursor) % len(self.created)]
+
+
+async def register(s: Session):
+    n = next(s.counter)
+    return await s.client.post("/register", json={
+        "name": f"suite {n}",
+        "email": f"suite-{s.tag}-{n}@bench.example.com",
+        "password": BENCH_PASSWORD,
+    })
+
+
+async def login_(s: Session):
+    return await s.client.post(
+        "/login", json={"email": s.email, "password": BENCH_PASSWORD}
+    )
+
+
+async def refresh(s: Session):
+    res = await s.client.post("/refresh", headers=s.refresh)
+    if res.status_code == 200:
+        s.refresh = refresh_cookie(res)
+    return res
+
+
+async def me(s: Session):
+    return await s.client.get("/me", headers=s.user)
+
+
+async def list_tasks(s: Session):
+    return await s.client.get("/tasks", params={"limit": 50}, headers=s.user)
+
+
+async def create_task(s: Session):
+    res = await s.client.post(
+        "/tasks",
+        json={"title": f"suite task {next(s.counter)}", "priority": "Medium"},
+        headers=s.user,
+    )
+    if res.status_code == 200:
+        s.created.append(res.json()["id"])
+    return res
+
+
+async def patch_task(s: Session):
+    return await s.client.patch(
+        f"/tasks/{s.next_task()}", json={"completed": True}, headers=s.user
+    )
+
+
+async def update_task(s: Session):
+    return await s.client.put(
+        f"/tasks/{s.next_task()}",
+        json={"title": "suite task edited", "priority": "High", "completed": False},
+        headers=s.user,
+    )
+
+
+async def share_task(s: Session):
+    return await s.client.post(
+        f"/tasks/{s.next_task()}/shares",
+        json={"shares": [{"email": s.sharee, "permission": "viewer"}]},
+        headers=s.user,
+    )
+
+
+async def unshare_task(s: Session):
+    return await s.client.request(
+        "DELETE", f"/tasks/{s.next_task()}/shares",
+        json={"emails": [s.sharee]}, headers=s.user,
+    )
+
+
+async def delete_task(s: Session):
+    return await s.client.delete(f"/tasks/{s.created.pop()}", headers=s.user)
+
+
+async def admin_users(s: Session):
+    return await s.client.get("/admin/users", headers=s.admin)
+
+
+async def admin_tasks(s: Session):
+    return await s.client.get("/admin/tasks", headers=s.admin)
+
+
+async def admin_audit(s: Session):
+    return await s.client.get("/admin/audit", headers=s.admin)
+
+
+# (name, request, share of --requests); run in this order, since the
+# update, share and delete scenarios work on the tasks created before
+SCENARIOS = [
+    ("register", register, AUTH_SHARE),
+    ("login", login_, AUTH_SHARE),
+    ("refresh", refresh, 1),
+    ("me", me, 1),
+    ("tasks list", list_tasks, 1),
+    ("tasks create", create_task, 1),
+    ("tasks patch", patch_task, 1),
+    ("tasks update", update_task, 1),
+    ("tasks share", share_task, 1),
+    ("tasks unshare", unshare_task, 1),
+    ("tasks delete", delete_task, 1),
+    ("admin users", admin_users, 1),
+    ("admin tasks", admin_tasks, 1),
+    ("admin audit", admin_audit, 1),
+]
+
+
+async def run_scenario(sessions, request, count: int):
+    """
+    Send `count` requests spread over the sessions, each session
+    sending its share one after another. Returns latencies,
+    wall time and the number of failed responses.
+    """
+    latencies = []
+    errors = 0
+
+    async def drive(s: Session, n: int):
+        nonlocal errors
+        for _ in range(n):
+            t0 = time.perf_counter()
+            res = await request(s)
+            latencies.append(time.perf_counter() - t0)
+            if res.status_code >= 400:
+                errors += 1
+
+    per_session = max(1, count // len(sessions))
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(s, per_session) for s in sessions))
+    return latencies, time.perf_counter() - start, errors
+
+
+def result_row(latencies, elapsed: float, errors: int, queries: int | None):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "queries": queries / len(latencies) if queries is not None and latencies else None,
+    }
+
+
+async def run_inprocess(args):
+    transport = httpx.ASGITransport(app=app)
+    # with the app's background services, as under uvicorn
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.wait_for(revocations.synced.wait(), 10)
+        sessions = [Session(client, 1 + i) for i in range(args.concurrency)]
+        for s in sessions:
+            await s.start()
+
+        results = {}
+        for name, request, share in SCENARIOS:
+            count = max(args.concurrency, int(args.requests * share))
+            with count_queries() as stats:
+                latencies, elapsed, errors = await run_scenario(sessions, request, count)
+            results[name] = result_row(latencies, elapsed, errors, stats.statements)
+        return results
+
+
+def load_generator(base_url, index: int, args, barrier, queue):
+    """
+    One load generator process: its own event loop and clients,
+    stepping through the scenarios in lockstep with the others.
+    """
+    async def main():
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            sessions = [
+                Session(client, 1 + index * args.concurrency + i)
+                for i in range(args.concurrency)
+            ]
+            for s in sessions:
+                await s.start()
+
+            for name, request, share in SCENARIOS:
+                count = max(args.concurrency, int(args.requests * share) // args.procs)
+                barrier.wait()
+                started = time.time()
+                latencies, _, errors = await run_scenario(sessions, request, count)
+                queue.put((name, latencies, started, time.time(), errors))
+
+    asyncio.run(main())
+
+
+def run_load(args):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.procs)
+    queue = context.Queue()
+
+    with serve(args.workers) as base_url:
+        procs = [
+            context.Process(target=load_generator, args=(base_url, i, args, barrier, queue))
+            for i in range(args.procs)
+        ]
+        for p in procs:
+            p.start()
+
+        collected = {}
+        for _ in range(args.procs * len(SCENARIOS)):
+            name, latencies, started, ended, errors = queue.get()
+            collected.setdefault(name, []).append((latencies, started, ended, errors))
+
+        for p in procs:
+            p.join()
+
+    results = {}
+    for name, _, _ in SCENARIOS:
+        parts = collected[name]
+        latencies = [x for part in parts for x in part[0]]
+        elapsed = max(p[2] for p in parts) - min(p[1] for p in parts)
+        results[name] = result_row(latencies, elapsed, sum(p[3] for p in parts), None)
+    return results
+
+
+def report(results):
+    print(
+        f"{'scenario':<16} {'req':>6} {'err':>4} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+    )
+    for name, row in results.items():
+        queries = "-" if row["queries"] is None else f"{row['queries']:.2f}"
+        print(
+            f"{name:<16} {row['requests']:>6} {row['errors']:>4} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {queries:>8}"
+        )
+
+
+def regressions(results, baseline, tolerance: float):
+    """
+    Every way the results are worse than the baseline, as messages.
+    Latency and throughput get `tolerance` of slack, query counts
+    QUERY_SLACK, errors none.
+    """
+    problems = []
+    for name, row in results.items():
+        if row["errors"]:
+            problems.append(f"{name}: {row['errors']} failed requests")
+
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        # tail percentiles over a few hundred requests on a shared
+        # machine are too noisy to gate on; they are reported only
+        if row["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p50 {row['p50_ms']:.2f} ms vs {base['p50_ms']:.2f} ms")
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {row['rps']:.1f} req/s vs {base['rps']:.1f} req/s")
+        if (
+            row["queries"] is not None and base.get("queries") is not None
+            and row["queries"] > base["queries"] + QUERY_SLACK
+        ):
+            problems.append(f"{name}: queries {row['queries']:.2f} vs {base['queries']:.2f}")
+    return problems
+
+
+def main(args):
+    users = 2 + max(args.concurrency * args.procs, args.concurrency)
+    seed(max(users, args.users), args.todos, args.shares)
+    with SessionLocal() as db:
+        db.execute(update(User).where(User.email == bench_email(0)).values(role="admin"))
+        db.commit()
+
+    if args.mode == "load":
+        results = run_load(args)
+    else:
+        results = asyncio.run(run_inprocess(args))
+    report(results)
+
+    path = Path(args.baseline or BASELINE_DIR / f"{args.mode}.json")
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+        print(f"baseline saved to {path}")
+        return 0
+
+    if not path.exists():
+        print(f"no baseline at {path}; run with --save-baseline to record one")
+        return 0
+
+    problems = regressions(results, orjson.loads(path.read_bytes()), args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print(f"compared with {path}: {len(problems)} regressions")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("inprocess", "load"), default="inprocess")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos", type=int, default=100)
+    parser.add_argument("--shares", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=400,
+                        help="requests per scenario (auth scenarios run a tenth)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="concurrent clients, per process in load mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="uvicorn workers in load mode")
+    parser.add_argument("--procs", type=int, default=2,
+                        help="load generator processes in load mode")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baseline", help="baseline file (default: benchmarks/baselines/<mode>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -1,42 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+# .env must be loaded before any app module reads its settings
+from app.core import config  # noqa: F401
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
 
+from app.core.audit import audit
+from app.core.events import task_events
+from app.core.hashing import hash_pool
+from app.core.health import db_pinger
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware
+from app.core.purge import PURGE_INTERVAL, run_purge_loop
+from app.core.revocation import revocations
+from app.core.startup import warm_up
 from app.database import Base, engine
 from app.routes.auth_routes import router as auth_router
 from app.routes.todo_routes import router as todo_router
 from app.routes.admin_routes import router as admin_router
 from app.routes.health import router as health_router
+from app.routes.pages import router as pages_router
+from app.routes.metrics import router as metrics_router
 
 
-app = FastAPI(title="Auth Todo API",
-    description="Authentication-based Todo application with RBAC and sharing",
-    version="1.0.0")
-security = HTTPBearer()
-
-BASE_DIR = Path(__file__).resolve().parent
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db_pinger.start()
+    revocations.start()
+    # listens from the start, not on the first stream: its notifications
+    # also evict cached task permissions in this worker
+    task_events.start()
+    await warm_up(app)
+    purge = None
+    if PURGE_INTERVAL > 0:
+        purge = asyncio.create_task(run_purge_loop(PURGE_INTERVAL))
 
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+    yield
 
-@app.get("/", response_class=HTMLResponse)
-def dashboard():
-    return (BASE_DIR / "static" / "index.html").read_text(encoding="utf-8")
+    if purge is not None:
+        purge.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge
+    # ends open /tasks/stream responses and closes the LISTEN connection
+    await task_events.stop()
+    await revocations.stop()
+    await db_pinger.stop()
+    await audit.stop()
+    hash_pool.shutdown()
 
-@app.get("/login", response_class=HTMLResponse)
-def login_page():
-    return (BASE_DIR / "static" / "login.html").read_text(encoding="utf-8")
 
-@app.get("/register", response_class=HTMLResponse)
-def register_page():
-    return (BASE_DIR / "static" / "register.html").read_text(encoding="utf-8")
+app = FastAPI(title="Auth Todo API",
+    description="Authentication-based Todo application with RBAC and sharing",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan)
+security = HTTPBearer()
 
+app.include_router(pages_router)
 app.include_router(auth_router)
 app.include_router(todo_router)
 app.include_router(admin_router)
 app.include_router(health_router)
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 
 
 # from app.database import SessionLocal
@@ -25,46 +25,79 @@ async function loadAdminInfo() {
 }
 
 
+async function countTasks(query = "") {
+    const res = await apiFetch(`/admin/tasks?limit=1${query}`);
+    return Number(res.headers.get("X-Total-Count") || 0);
+}
+
 async function showStats() {
-    const users = await (await apiFetch("/admin/users")).json();
-    const tasks = await (await apiFetch("/admin/tasks")).json();
+    const users = await (await apiFetch("/admin/users?limit=1")).json();
+    const [total, completed, shared] = await Promise.all([
+        countTasks(),
+        countTasks("&completed=true"),
+        countTasks("&shared=true")
+    ]);
 
     adminTitle.textContent = "System Overview";
 
     adminData.innerHTML = `
-        <div class="admin-card">👥 Total Users: ${users.length}</div>
-        <div class="admin-card">📋 Total Tasks: ${tasks.length}</div>
-        <div class="admin-card">✅ Completed Tasks: ${tasks.filter(t => t.completed).length}</div>
-        <div class="admin-card">🔄 Shared Tasks: ${tasks.filter(t => t.shared_count > 0).length}</div>
+        <div class="admin-card">👥 Total Users: ${users.estimated_total}</div>
+        <div class="admin-card">📋 Total Tasks: ${total}</div>
+        <div class="admin-card">✅ Completed Tasks: ${completed}</div>
+        <div class="admin-card">🔄 Shared Tasks: ${shared}</div>
     `;
 }
 
-async function loadUsers() {
-    const users = await (await apiFetch("/admin/users")).json();
+async function loadUsers(cursor = null) {
+    const params = new URLSearchParams({ limit: 50, include_counts: "true" });
+    if (cursor) {
+        params.set("cursor", cursor);
+    }
+    const page = await (await apiFetch(`/admin/users?${params}`)).json();
 
-    adminTitle.textContent = "All Users";
+    adminTitle.textContent = `All Users (${page.estimated_total})`;
 
-    adminData.innerHTML = users.map(u => `
+    const cards = page.items.map(u => `
         <div class="admin-card">
             <b>${u.name}</b><br>
             ${u.email}<br>
-            Role: <b>${u.role}</b>
+            Role: <b>${u.role}</b><br>
+            Tasks: ${u.task_count} · Shared with: ${u.shared_count}
         </div>
     `).join("");
+
+    document.getElementById("moreUsers")?.remove();
+    adminData.innerHTML = (cursor ? adminData.innerHTML : "") + cards + (
+        page.next_cursor
+            ? `<div class="admin-card" id="moreUsers">
+                <button onclick="loadUsers('${page.next_cursor}')">Load more</button>
+               </div>`
+            : ""
+    );
 }
 
-async function loadAdminTasks() {
+const TASK_PAGE_SIZE = 50;
+
+async function loadAdminTasks(page = 1) {
     const search = document.getElementById("searchInput")?.value.trim();
+    const filter = document.getElementById("taskFilter")?.value;
 
-    let url = "/admin/tasks";
+    const params = new URLSearchParams({ page, limit: TASK_PAGE_SIZE });
     if (search) {
-        url += `?search=${encodeURIComponent(search)}`;
+        params.set("search", search);
+    }
+    if (filter === "completed") {
+        params.set("completed", "true");
+    } else if (filter === "shared") {
+        params.set("shared", "true");
     }
 
-    const res = await apiFetch(url);
+    const res = await apiFetch(`/admin/tasks?${params}`);
     const tasks = await res.json();
+    const total = Number(res.headers.get("X-Total-Count") || tasks.length);
+    const pages = Math.max(1, Math.ceil(total / TASK_PAGE_SIZE));
 
-    adminTitle.textContent = "All Tasks";
+    adminTitle.textContent = `All Tasks (${total})`;
 
     if (!tasks.length) {
         adminData.innerHTML = "<p>No tasks found</p>";
@@ -95,7 +128,15 @@ async function loadAdminTasks() {
                 🗑 Delete
             </button>
         </div>
-    `).join("");
+    `).join("") + `
+        <div class="admin-card">
+            <button ${page <= 1 ? "disabled" : ""}
+                onclick="loadAdminTasks(${page - 1})">⬅ Prev</button>
+            Page ${page} of ${pages}
+            <button ${page >= pages ? "disabled" : ""}
+                onclick="loadAdminTasks(${page + 1})">Next ➡</button>
+        </div>
+    `;
 }
 
 
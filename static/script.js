@@ -59,119 +59,193 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
-    async function loadTasks() {
-        const res = await apiFetch("/tasks");
-        if (!res.ok) return;
+    function renderTask(task) {
+        const div = document.createElement("div");
+        div.className = "task";
+        div.dataset.id = task.id;
+
+        const isOwner = task.permission === "owner";
+        const isEditor = task.permission === "editor";
+        const isViewer = task.permission === "viewer";
+
+        div.innerHTML = `
+            <input type="checkbox"
+                ${task.completed ? "checked" : ""}
+                ${isViewer ? "disabled" : ""}>
+
+            <span class="title">
+                ${task.completed ? `<s>${task.title}</s>` : task.title}
+            </span>
+
+            <span class="${task.priority.toLowerCase()}">${task.priority}</span>
+
+            <span class="perm ${task.permission}">
+                ${task.permission.toUpperCase()}
+            </span>
+
+            ${isOwner ? `<button class="share">➤</button>` : ``}
+            ${(isOwner || isEditor) ? `<button class="edit">✏️</button>` : ``}
+            ${isOwner ? `<button class="delete">🗑</button>` : ``}
+        `;
+
+        if (!isViewer) {
+            div.querySelector("input").addEventListener("change", async () => {
+                const res = await apiFetch(`/tasks/${task.id}`, {
+                    method: "PATCH",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify({ completed: !task.completed })
+                });
+                if (res.ok) {
+                    upsertTask({ ...(await res.json()), permission: task.permission });
+                }
+            });
+        }
+
+        if (isOwner || isEditor) {
+            div.querySelector(".edit")?.addEventListener("click", async () => {
+                const newTitle = prompt("Edit task title", task.title);
+                if (!newTitle) return;
+
+                const newPriority = prompt(
+                    "Edit priority (High / Medium / Low)",
+                    task.priority
+                );
+                if (!["High", "Medium", "Low"].includes(newPriority)) return;
+
+                const res = await apiFetch(`/tasks/${task.id}`, {
+                    method: "PUT",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify({
+                        title: newTitle,
+                        priority: newPriority,
+                        completed: task.completed
+                    })
+                });
+                if (res.ok) {
+                    upsertTask({ ...(await res.json()), permission: task.permission });
+                }
+            });
+        }
+
+        if (isOwner) {
+            div.querySelector(".delete")?.addEventListener("click", async () => {
+                const res = await apiFetch(`/tasks/${task.id}`, { method: "DELETE" });
+                if (res.ok) removeTask(task.id);
+            });
+
+            div.querySelector(".share")?.addEventListener("click", () => {
+                currentShareTaskId = task.id;
+                document.getElementById("shareModal").classList.remove("hidden");
+            });
+        }
+
+        return div;
+    }
+
+    function updateCounts() {
+        doneCountEl.textContent = completedTasksBox.children.length;
+        pendingCountEl.textContent = todayTasksBox.children.length;
+    }
+
+    function removeTask(id) {
+        document.querySelector(`.task[data-id="${id}"]`)?.remove();
+        updateCounts();
+    }
+
+    // Insert or replace a task, keeping each box ordered by id
+    function upsertTask(task) {
+        document.querySelector(`.task[data-id="${task.id}"]`)?.remove();
+
+        const box = task.completed ? completedTasksBox : todayTasksBox;
+        const div = renderTask(task);
+
+        const last = box.lastElementChild;
+        if (!last || Number(last.dataset.id) < task.id) {
+            box.appendChild(div);
+        } else {
+            const next = [...box.children].find(el => Number(el.dataset.id) > task.id);
+            box.insertBefore(div, next);
+        }
 
-        const tasks = await res.json();
+        updateCounts();
+    }
 
+    async function loadTasks() {
         todayTasksBox.innerHTML = "";
         completedTasksBox.innerHTML = "";
 
-        let done = 0;
-        let pending = 0;
-
-
-        tasks.forEach(task => {
-            const div = document.createElement("div");
-            div.className = "task";
-
-            const isOwner = task.permission === "owner";
-            const isEditor = task.permission === "editor";
-            const isViewer = task.permission === "viewer";
-
-            div.innerHTML = `
-                <input type="checkbox"
-                    ${task.completed ? "checked" : ""}
-                    ${isViewer ? "disabled" : ""}>
-
-                <span class="title">
-                    ${task.completed ? `<s>${task.title}</s>` : task.title}
-                </span>
-
-                <span class="${task.priority.toLowerCase()}">${task.priority}</span>
-
-                <span class="perm ${task.permission}">
-                    ${task.permission.toUpperCase()}
-                </span>
-
-                ${isOwner ? `<button class="share">➤</button>` : ``}
-                ${(isOwner || isEditor) ? `<button class="edit">✏️</button>` : ``}
-                ${isOwner ? `<button class="delete">🗑</button>` : ``}
-            `;
-
-            if (!isViewer) {
-                div.querySelector("input").addEventListener("change", async () => {
-                    await apiFetch(`/tasks/${task.id}`, {
-                        method: "PUT",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({
-                            title: task.title,
-                            priority: task.priority,
-                            completed: !task.completed
-                        })
-                    });
-                    loadTasks();
-                });
-            }
+        let cursor = null;
 
-            if (isOwner || isEditor) {
-                div.querySelector(".edit")?.addEventListener("click", async () => {
-                    const newTitle = prompt("Edit task title", task.title);
-                    if (!newTitle) return;
-
-                    const newPriority = prompt(
-                        "Edit priority (High / Medium / Low)",
-                        task.priority
-                    );
-                    if (!["High", "Medium", "Low"].includes(newPriority)) return;
-
-                    await apiFetch(`/tasks/${task.id}`, {
-                        method: "PUT",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({
-                            title: newTitle,
-                            priority: newPriority,
-                            completed: task.completed
-                        })
-                    });
-                    loadTasks();
-                });
-            }
+        // Render each page as it arrives instead of waiting for the whole list
+        do {
+            const url = cursor
+                ? `/tasks?cursor=${encodeURIComponent(cursor)}`
+                : "/tasks";
+            const res = await apiFetch(url);
+            if (!res.ok) return;
 
-            if (isOwner) {
-                div.querySelector(".delete")?.addEventListener("click", async () => {
-                    await apiFetch(`/tasks/${task.id}`, { method: "DELETE" });
-                    loadTasks();
-                });
+            const page = await res.json();
+            cursor = page.next_cursor;
 
-                div.querySelector(".share")?.addEventListener("click", () => {
-                    currentShareTaskId = task.id;
-                    document.getElementById("shareModal").classList.remove("hidden");
-                });
-            }
+            page.items.forEach(upsertTask);
+        } while (cursor);
 
-            if (task.completed) {
-                done++;
-                completedTasksBox.appendChild(div);
-            } else {
-                pending++;
-                todayTasksBox.appendChild(div);
-            }
-        });
+        overdueCountEl.textContent = 0;
+    }
+
+    function applyTaskEvent(event) {
+        if (event.type === "ready" || event.type === "resync") {
+            loadTasks();
+        } else if (event.task) {
+            upsertTask(event.task);
+        } else {
+            removeTask(event.id);
+        }
+    }
 
-       
+    // Live deltas from /tasks/stream (Server-Sent Events read through
+    // fetch, since EventSource cannot send the Authorization header)
+    async function streamTasks() {
+        for (;;) {
+            try {
+                const res = await apiFetch("/tasks/stream");
+                if (res.ok && res.body) {
+                    const reader = res.body
+                        .pipeThrough(new TextDecoderStream())
+                        .getReader();
+                    let buffer = "";
+
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+
+                        buffer += value;
+                        let end;
+                        while ((end = buffer.indexOf("\n\n")) !== -1) {
+                            const data = buffer.slice(0, end)
+                                .split("\n")
+                                .filter(line => line.startsWith("data:"))
+                                .map(line => line.slice(5))
+                                .join("\n");
+                            buffer = buffer.slice(end + 2);
+
+                            if (data) applyTaskEvent(JSON.parse(data));
+                        }
+                    }
+                }
+            } catch (err) {
+                // network error; retry below
+            }
 
-        doneCountEl.textContent = done;
-        pendingCountEl.textContent = pending;
-        overdueCountEl.textContent = 0;
+            await new Promise(resolve => setTimeout(resolve, 2000));
+        }
     }
 
     async function addTask() {
         const title = taskInput.value.trim();
         if (!title) return;
 
-        await apiFetch("/tasks", {
+        const res = await apiFetch("/tasks", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({
@@ -182,7 +256,9 @@ document.addEventListener("DOMContentLoaded", () => {
         });
 
         taskInput.value = "";
-        loadTasks();
+        if (res.ok) {
+            upsertTask({ ...(await res.json()), permission: "owner" });
+        }
     }
 
     window.shareTask = async function () {
@@ -214,4 +290,5 @@ document.addEventListener("DOMContentLoaded", () => {
 
     loadUser();
     loadTasks();
+    streamTasks();
 });
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+# settings are read at import time; keep app startup lean under test
+os.environ.setdefault("STARTUP_WARMUP", "false")
+os.environ.setdefault("PURGE_INTERVAL", "0")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,98 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def make_cache(**options):
+    return TTLCache("test", **{"maxsize": 10, "ttl": 60, **options})
+
+
+def test_set_with_current_generation_is_stored():
+    cache = make_cache()
+    cache.set("key", "viewer", generation=cache.generation)
+
+    assert cache.get("key") == "viewer"
+
+
+def test_value_loaded_before_delete_is_dropped():
+    cache = make_cache()
+    generation = cache.generation
+
+    # an invalidating write lands while the value is being loaded
+    cache.delete("key")
+    cache.set("key", "editor", generation=generation)
+
+    assert cache.get("key") is None
+
+
+def test_value_loaded_before_delete_of_other_key_is_dropped():
+    cache = make_cache()
+    generation = cache.generation
+
+    cache.delete("other")
+    cache.set("key", "editor", generation=generation)
+
+    assert cache.get("key") is None
+
+
+def test_delete_where_drops_matches_and_bumps_generation():
+    cache = make_cache()
+    cache.set((1, 10), "owner")
+    cache.set((1, 11), "viewer")
+    cache.set((2, 10), "owner")
+    generation = cache.generation
+
+    cache.delete_where(lambda key: key[0] == 1)
+
+    assert cache.generation == generation + 1
+    assert cache.get((1, 10)) is None
+    assert cache.get((1, 11)) is None
+    assert cache.get((2, 10)) == "owner"
+
+
+def test_clear_drops_in_flight_values():
+    cache = make_cache()
+    generation = cache.generation
+
+    cache.clear()
+    cache.set("key", "viewer", generation=generation)
+
+    assert cache.get("key") is None
+
+
+def test_expired_entry_is_a_miss():
+    cache = make_cache(ttl=0.01)
+    cache.set("key", "viewer")
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = make_cache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(enabled=False)
+    cache.set("key", "viewer")
+
+    assert cache.get("key") is None
+
+
+def test_delete_returns_value_without_touching_stats():
+    cache = make_cache()
+    cache.set("key", "viewer")
+
+    assert cache.delete("key") == "viewer"
+    assert cache.delete("key") is None
+    assert (cache.hits, cache.misses) == (0, 0)
@@ -0,0 +1,246 @@
+"""
+get_task_permission against a migrated database: every write that
+changes access must evict the cached answer, so a stale permission
+never outlives it.
+
+Needs DATABASE_URL and SECRET_KEY (or a .env) pointing at a database
+migrated to head; skipped otherwise.
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, insert, update
+
+from app.core import config  # noqa: F401  loads .env
+
+if not (os.getenv("DATABASE_URL") and os.getenv("SECRET_KEY")):
+    pytest.skip("DATABASE_URL and SECRET_KEY are not set", allow_module_level=True)
+
+import httpx
+
+from app.core.events import notify_task_changes, task_events
+from app.core.security import create_access_token
+from app.database import AsyncSessionLocal, async_engine
+from app.deps import get_task_permission, invalidate_task_permissions, permission_cache
+from app.models.todo import Todo
+from app.models.user import User
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    permission_cache.clear()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+    # pooled connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def users():
+    """
+    Three fresh users: owner, bob and an admin, as
+    {name: (id, email, auth headers)}.
+    """
+    suffix = uuid.uuid4().hex[:12]
+    rows = [
+        {"name": name, "email": f"{name}-{suffix}@test.io", "password": "-", "role": role}
+        for name, role in (("owner", "user"), ("bob", "user"), ("admin", "admin"))
+    ]
+    async with AsyncSessionLocal() as db:
+        ids = (await db.scalars(insert(User).returning(User.id), rows)).all()
+        await db.commit()
+
+    return {
+        row["name"]: (
+            user_id,
+            row["email"],
+            {"Authorization": f"Bearer {create_access_token(user_id, row['role'])}"},
+        )
+        for user_id, row in zip(ids, rows)
+    }
+
+
+async def permission(task_id: int, user_id: int):
+    async with AsyncSessionLocal() as db:
+        return await get_task_permission(task_id, user_id, db)
+
+
+async def denied(task_id: int, user_id: int) -> int:
+    with pytest.raises(HTTPException) as exc:
+        await permission(task_id, user_id)
+    return exc.value.status_code
+
+
+def cached(task_id: int, user_id: int):
+    return permission_cache.get((task_id, user_id))
+
+
+async def create_task(client, headers) -> int:
+    res = await client.post("/tasks", json={"title": "shared", "priority": "Low"}, headers=headers)
+    assert res.status_code == 200
+    return res.json()["id"]
+
+
+async def share(client, task_id, owner_headers, email, permission_name):
+    res = await client.post(
+        f"/tasks/{task_id}/share",
+        params={"user_email": email, "permission": permission_name},
+        headers=owner_headers,
+    )
+    assert res.status_code == 200
+
+
+async def test_answers_are_cached(client, users):
+    owner_id, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "viewer")
+
+    assert await permission(task_id, owner_id) == "owner"
+    assert await permission(task_id, bob_id) == "viewer"
+    assert cached(task_id, owner_id) == "owner"
+    assert cached(task_id, bob_id) == "viewer"
+
+
+async def test_denials_are_not_cached(client, users):
+    _, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+
+    assert await denied(task_id, bob_id) == 403
+    assert cached(task_id, bob_id) is None
+
+    await share(client, task_id, owner, bob_email, "viewer")
+    assert await permission(task_id, bob_id) == "viewer"
+
+
+async def test_bulk_share_evicts_changed_permission(client, users):
+    _, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "viewer")
+    assert await permission(task_id, bob_id) == "viewer"
+
+    res = await client.post(
+        f"/tasks/{task_id}/shares",
+        json={"shares": [{"email": bob_email, "permission": "editor"}]},
+        headers=owner,
+    )
+    assert res.json()["results"][0]["status"] == "updated"
+
+    assert cached(task_id, bob_id) is None
+    assert await permission(task_id, bob_id) == "editor"
+
+
+async def test_revoke_evicts_share(client, users):
+    owner_id, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "editor")
+    assert await permission(task_id, owner_id) == "owner"
+    assert await permission(task_id, bob_id) == "editor"
+
+    res = await client.request(
+        "DELETE", f"/tasks/{task_id}/shares", json={"emails": [bob_email]}, headers=owner
+    )
+    assert res.json()["results"] == [{"email": bob_email, "status": "revoked"}]
+
+    assert cached(task_id, bob_id) is None
+    assert await denied(task_id, bob_id) == 403
+    # only the revoked user's entry goes
+    assert cached(task_id, owner_id) == "owner"
+
+
+@pytest.mark.parametrize("how", ["owner", "batch", "admin"])
+async def test_delete_evicts_every_user(client, users, how):
+    owner_id, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    _, _, admin = users["admin"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "viewer")
+    assert await permission(task_id, owner_id) == "owner"
+    assert await permission(task_id, bob_id) == "viewer"
+
+    if how == "owner":
+        res = await client.delete(f"/tasks/{task_id}", headers=owner)
+    elif how == "batch":
+        res = await client.request("DELETE", "/tasks/batch", json={"ids": [task_id]}, headers=owner)
+    else:
+        res = await client.delete(f"/admin/tasks/{task_id}", headers=admin)
+    assert res.status_code == 200
+
+    assert cached(task_id, owner_id) is None
+    assert cached(task_id, bob_id) is None
+    assert await denied(task_id, owner_id) == 404
+    assert await denied(task_id, bob_id) == 404
+
+
+async def test_delete_in_another_worker_evicts(client, users):
+    owner_id, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "editor")
+    assert await permission(task_id, owner_id) == "owner"
+    assert await permission(task_id, bob_id) == "editor"
+
+    async with asyncio.timeout(10):
+        while not task_events.listening.is_set():
+            await asyncio.sleep(0.05)
+
+    # what another worker's delete does: the write and its notification,
+    # with no local invalidate_task_permissions call
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Todo).where(Todo.id == task_id).values(is_deleted=True)
+        )
+        await notify_task_changes(db, "deleted", [task_id])
+        await db.commit()
+
+    async with asyncio.timeout(10):
+        while cached(task_id, owner_id) or cached(task_id, bob_id):
+            await asyncio.sleep(0.05)
+    assert await denied(task_id, owner_id) == 404
+
+
+async def test_restore_brings_permissions_back(client, users):
+    owner_id, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    _, _, admin = users["admin"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "editor")
+    await client.delete(f"/tasks/{task_id}", headers=owner)
+    assert await denied(task_id, bob_id) == 404
+
+    generation = permission_cache.generation
+    res = await client.post(f"/admin/tasks/{task_id}/restore", headers=admin)
+    assert res.status_code == 200
+
+    # a lookup that started before the restore cannot cache its answer
+    assert permission_cache.generation > generation
+    assert await permission(task_id, owner_id) == "owner"
+    assert await permission(task_id, bob_id) == "editor"
+
+
+async def test_write_during_lookup_is_not_cached(client, users):
+    _, _, owner = users["owner"]
+    bob_id, bob_email, _ = users["bob"]
+    task_id = await create_task(client, owner)
+    await share(client, task_id, owner, bob_email, "editor")
+
+    async with AsyncSessionLocal() as db:
+        # a revoke commits while the lookup's query is in flight
+        @event.listens_for(db.sync_session, "do_orm_execute")
+        def revoke_meanwhile(state):
+            invalidate_task_permissions(task_id, bob_id)
+
+        assert await get_task_permission(task_id, bob_id, db) == "editor"
+
+    assert cached(task_id, bob_id) is None
@@ -0,0 +1,96 @@
+"""
+Refresh token rotation and logout against a migrated database.
+
+Needs DATABASE_URL and SECRET_KEY (or a .env); skipped otherwise.
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import insert
+
+from app.core import config  # noqa: F401  loads .env
+
+if not (os.getenv("DATABASE_URL") and os.getenv("SECRET_KEY")):
+    pytest.skip("DATABASE_URL and SECRET_KEY are not set", allow_module_level=True)
+
+import httpx
+
+from app.core.metrics import count_queries
+from app.core.revocation import revocations
+from app.core.security import create_refresh_token
+from app.database import AsyncSessionLocal, async_engine
+from app.models.user import User
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    async with app.router.lifespan_context(app):
+        await asyncio.wait_for(revocations.synced.wait(), 10)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def user_id():
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            insert(User)
+            .values(name="refresh", email=f"refresh-{uuid.uuid4().hex[:12]}@test.io", password="-")
+            .returning(User.id)
+        )
+        await db.commit()
+    return user_id
+
+
+async def refresh(client, token):
+    # the cookie is Secure, so the client jar will not send it over http
+    res = await client.post("/refresh", headers={"Cookie": f"refresh_token={token}"})
+    return res.status_code, res.cookies.get("refresh_token")
+
+
+async def test_refresh_rotates_the_token(client, user_id):
+    first = create_refresh_token(user_id, "user")
+
+    status, second = await refresh(client, first)
+    assert status == 200
+    assert (await refresh(client, second))[0] == 200
+
+
+async def test_logout_ends_every_token_of_the_session(client, user_id):
+    first = create_refresh_token(user_id, "user")
+    _, second = await refresh(client, first)
+    _, third = await refresh(client, second)
+
+    res = await client.post("/logout", headers={"Cookie": f"refresh_token={third}"})
+    assert res.status_code == 200
+
+    for token in (first, second, third):
+        assert (await refresh(client, token))[0] == 401
+
+
+async def test_concurrent_refreshes_of_one_token_all_succeed(client, user_id):
+    # two tabs, or a client retrying after a lost response
+    token = create_refresh_token(user_id, "user")
+
+    results = await asyncio.gather(*(refresh(client, token) for _ in range(3)))
+
+    assert [status for status, _ in results] == [200, 200, 200]
+    for _, rotated in results:
+        assert (await refresh(client, rotated))[0] == 200
+
+
+async def test_refresh_runs_no_queries(client, user_id):
+    token = create_refresh_token(user_id, "user")
+
+    with count_queries() as stats:
+        status, _ = await refresh(client, token)
+
+    assert status == 200
+    assert stats.statements == 0